@@ -0,0 +1,225 @@
+"""Benchmark và kiểm tra độ chính xác của VietnameseNLPProcessor (không cần Tk)
+
+Chạy bộ câu NLP_TEST_CASES với thời điểm tham chiếu cố định, so với kết quả
+mong đợi (GOLDEN) rồi đo thời gian từng bước: preprocess, name, location,
+reminder, recurrence, time (ops/s, p50, p99).
+
+Ví dụ:
+    python bench_nlp.py                      # kiểm tra + đo trên bộ câu mẫu
+    python bench_nlp.py --size 100000        # nhân bản tổng hợp lên 100k câu
+    python bench_nlp.py --size 20000 --workers 1 2 4   # đo thêm process_texts, in tốc độ tăng
+    python bench_nlp.py --check              # chỉ kiểm tra độ chính xác
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+from main import NLP_TEST_CASES, VietnameseNLPProcessor, get_word_tokenize
+
+# Thời điểm tham chiếu cố định (thứ Tư) để "mai", "thứ 2 tuần tới"... cho kết quả ổn định
+REFERENCE_NOW = datetime(2025, 1, 8, 8, 0)
+
+# Kết quả mong đợi của NLP_TEST_CASES tại REFERENCE_NOW:
+# (sự kiện, bắt đầu, kết thúc, địa điểm, nhắc trước bao nhiêu phút, RRULE)
+GOLDEN = [
+    ('họp nhóm', '2025-01-09T10:00:00', None, 'phòng 302', 15, None),
+    ('hop nhom', '2025-01-09T10:30:00', '2025-01-09T12:00:00', 'phong 302', 15, None),
+    ('họp công ty', '2025-01-20T10:30:00', None, 'tầng trệt', 20, None),
+    ('họp công ty', '2025-01-19T10:30:00', None, 'tầng trệt', 20, None),
+    ('họp công ty', '2025-01-11T09:30:00', None, 'tầng 5', 20, None),
+    ('họp', '2025-01-09T08:30:00', None, 'văn phòng', 30, None),
+    ('gọi điện cho khách hàng', '2025-01-09T15:00:00', None, '', 0, None),
+    ('hop', '2025-01-14T10:00:00', None, '', 60, None),
+    ('đi tập thể dục', '2025-01-08T06:00:00', None, '', 0, None),
+    ('nop bao cao', '2025-01-10T17:00:00', None, '', 120, None),
+    ('họp nhóm', '2025-01-09T14:30:00', None, '', 0, None),
+    ('đón con', '2025-01-09T11:45:00', None, '', 15, None),
+    ('gap doi tac', '2025-01-20T09:00:00', None, '', 0, None),
+    ('họp công ty', '2025-01-10T13:00:00', None, '', 45, None),
+    ('di kham benh', '2025-01-11T08:15:00', None, '', 0, None),
+    ('họp online', '2025-01-08T20:00:00', None, '', 10, None),
+    ('học bài', '2025-01-09T19:30:00', None, '', 0, None),
+    ('hop', '2025-01-11T10:00:00', None, '', 30, None),
+    ('gửi email', '2025-01-08T16:45:00', None, '', 0, None),
+    ('họp', '2025-01-12T09:00:00', None, 'phòng e502', 60, None),
+    ('di sieu thi', '2025-01-11T10:30:00', None, '', 0, None),
+    ('họp', '2025-01-09T11:00:00', None, '', 20, None),
+    ('goi cho sep', '2025-01-10T15:30:00', None, '', 0, None),
+    ('họp tổng kết', '2025-01-08T14:00:00', None, '', 60, None),
+    ('dam cuoi', '2025-01-18T17:00:00', None, '', 0, None),
+    ('họp', '2025-01-20T08:00:00', None, '', 25, None),
+    ('gap ban', '2025-01-08T18:30:00', None, '', 0, None),
+    ('họp', '2025-01-09T07:45:00', None, '', 15, None),
+    ('nop bai', '2025-01-12T23:59:00', None, '', 0, None),
+    ('họp', '2025-01-09T12:00:00', None, '', 30, None),
+    ('họp', '2025-01-08T09:00:00', None, '', 0, 'FREQ=DAILY'),
+    ('tập thể dục', '2025-01-09T06:00:00', None, '', 0, 'FREQ=DAILY'),
+    ('họp nhóm', '2025-01-20T09:00:00', None, '', 0, 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO'),
+    ('nộp báo cáo', '2025-02-05T09:00:00', None, '', 0, 'FREQ=MONTHLY;BYMONTHDAY=5'),
+]
+
+FIELDS = ('event', 'start_time', 'end_time', 'location', 'reminder_minutes', 'recurrence')
+STAGES = ('preprocess', 'name', 'location', 'reminder', 'recurrence', 'time')
+
+NUMBER_RE = re.compile(r'(:?)(\d+)')
+
+
+def run_pipeline(processor, text, now=REFERENCE_NOW, timings=None):
+    """Chạy các bước của process_text, ghi thời gian từng bước (ns) vào timings"""
+    clock = time.perf_counter_ns
+    t0 = clock()
+    context = processor.build_context(text)
+    t1 = clock()
+    event_name = processor.extract_event_name_from_context(context)
+    t2 = clock()
+    location = processor.extract_location_from_context(context)
+    t3 = clock()
+    reminder_minutes = processor.extract_reminder_minutes_from_context(context)
+    t4 = clock()
+    recurrence = processor.extract_recurrence_from_context(context)
+    t5 = clock()
+    start_time, end_time = processor.parse_time_from_context(context, now)
+    start_time, end_time = processor.first_occurrence(recurrence, start_time, end_time, now)
+    t6 = clock()
+
+    if timings is not None:
+        for stage, elapsed in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5)):
+            timings[stage].append(elapsed)
+
+    return (event_name,
+            start_time.isoformat(),
+            end_time.isoformat() if end_time else None,
+            location,
+            reminder_minutes,
+            recurrence)
+
+
+def check_accuracy(processor):
+    """So với GOLDEN, trả về (số field đúng theo từng field, danh sách câu sai)
+
+    Mỗi câu được kiểm tra qua từng bước và qua process_text (đường có cache
+    template), cả hai phải khớp GOLDEN.
+    """
+    field_hits = dict.fromkeys(FIELDS, 0)
+    failures = []
+    for index, (text, expected) in enumerate(zip(NLP_TEST_CASES, GOLDEN), 1):
+        actual = run_pipeline(processor, text)
+        result = processor.process_text(text, now=REFERENCE_NOW)
+        for field, got, want in zip(FIELDS, actual, expected):
+            field_hits[field] += got == want and result.get(field) == want
+        if actual != expected or tuple(result.get(field) for field in FIELDS) != expected:
+            failures.append((index, text, actual, expected))
+    return field_hits, failures
+
+
+def synthetic_corpus(size, seed=0):
+    """Nhân bản NLP_TEST_CASES lên size câu, thay các con số để câu ít trùng lặp"""
+    rng = random.Random(seed)
+
+    def vary(match):
+        colon, digits = match.groups()
+        value = int(digits)
+        if colon:
+            return f":{rng.randint(0, 59):02d}"   # Phút của "10:30"
+        if value <= 7:
+            return digits                         # Thứ trong tuần, số tuần...
+        if value <= 23:
+            return str(rng.randint(1, 23))        # Giờ, phút nhắc nhở
+        return str(rng.randint(10, 999))          # Số phòng, tầng...
+
+    cases = NLP_TEST_CASES
+    return [NUMBER_RE.sub(vary, cases[i % len(cases)]) for i in range(size)]
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def print_timings(timings):
+    print(f"{'Bước':<12}{'ops/s':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+    total = 0
+    for stage in STAGES:
+        values = sorted(timings[stage])
+        elapsed = sum(values)
+        total += elapsed
+        print(f"{stage:<12}{len(values) / (elapsed / 1e9):>12.0f}"
+              f"{percentile(values, 0.50) / 1000:>12.1f}{percentile(values, 0.99) / 1000:>12.1f}")
+    count = len(timings[STAGES[0]])
+    print(f"{'tổng':<12}{count / (total / 1e9):>12.0f}")
+
+
+def measure_workers(corpus, worker_counts):
+    """Đo process_texts với từng số worker, so với xử lý tại chỗ
+    
+    Tắt cache phân tích (cache_size=0) để chỉ đo phân tích thật. Lần gọi đầu
+    gồm cả chi phí khởi động pool, lần thứ hai chạy trên pool đã nóng.
+    """
+    baseline = VietnameseNLPProcessor(cache_size=0)
+    started = time.perf_counter()
+    for text in corpus:
+        baseline.process_text(text, REFERENCE_NOW)
+    base_rate = len(corpus) / (time.perf_counter() - started)
+    print(f"\nprocess_texts ({len(corpus)} câu, {os.cpu_count()} lõi CPU), "
+          f"tại chỗ: {base_rate:.0f} câu/s")
+    print(f"{'worker':>8}{'lần đầu':>12}{'pool nóng':>12}{'tăng tốc':>10}  chạy")
+
+    for workers in worker_counts:
+        processor = VietnameseNLPProcessor(cache_size=0)
+        rates = []
+        errors = 0
+        for _ in range(2):
+            started = time.perf_counter()
+            results = processor.process_texts(corpus, workers=workers, now=REFERENCE_NOW)
+            rates.append(len(corpus) / (time.perf_counter() - started))
+            errors += sum(1 for result in results if "error" in result)
+        mode = f"pool {processor.pool_workers} worker" if processor.pool_workers else "tại chỗ"
+        processor.close()
+        print(f"{workers:>8}{rates[0]:>12.0f}{rates[1]:>12.0f}{rates[1] / base_rate:>9.2f}x  "
+              f"{mode}{f', {errors} lỗi' if errors else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=len(NLP_TEST_CASES),
+                        help='số câu đo (nhân bản tổng hợp nếu lớn hơn bộ mẫu)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[],
+                        help='đo thêm process_texts với (các) số worker này')
+    parser.add_argument('--check', action='store_true', help='chỉ kiểm tra độ chính xác')
+    args = parser.parse_args(argv)
+
+    processor = VietnameseNLPProcessor()
+    try:
+        get_word_tokenize()
+    except Exception as e:
+        print(f"Cảnh báo: không nạp được Underthesea ({e}), dùng tách từ đơn giản")
+
+    field_hits, failures = check_accuracy(processor)
+    total = len(GOLDEN)
+    print(f"Độ chính xác: {total - len(failures)}/{total} câu đúng hoàn toàn")
+    print("  " + ", ".join(f"{field} {hits}/{total}" for field, hits in field_hits.items()))
+    for index, text, actual, expected in failures:
+        print(f"  ✗ TEST {index}: {text}\n    được:   {actual}\n    mong đợi: {expected}")
+
+    if not args.check:
+        corpus = NLP_TEST_CASES if args.size == len(NLP_TEST_CASES) else synthetic_corpus(args.size, args.seed)
+        timings = {stage: [] for stage in STAGES}
+        for text in corpus:
+            run_pipeline(processor, text, timings=timings)
+        print(f"\nThời gian theo bước ({len(corpus)} câu):")
+        print_timings(timings)
+
+        if args.workers:
+            measure_workers(list(corpus), args.workers)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
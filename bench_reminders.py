@@ -0,0 +1,247 @@
+"""Benchmark tải của ReminderSystem với đồng hồ ảo (không cần Tk)
+
+Tạo một DB tạm với nhiều sự kiện tổng hợp (kèm một đợt nhiều nhắc nhở đến hạn
+trong cùng một phút và một số chuỗi lặp), rồi cho ReminderSystem chạy trên
+đồng hồ ảo với callback giả. Đo độ trễ gửi nhắc (theo đồng hồ ảo và thời gian
+thực), số nhắc bị lỡ / bị gửi trùng, CPU cho mỗi ngày mô phỏng và bộ nhớ.
+
+Ví dụ:
+    python bench_reminders.py                          # 100k sự kiện, 7 ngày, đợt 1k nhắc
+    python bench_reminders.py --events 20000 --days 1  # chạy nhanh
+    python bench_reminders.py --instances 2            # hai ReminderSystem cùng file DB, mỗi cái một thread
+    python bench_reminders.py --mode tick --step 30    # bước đồng hồ cố định 30 giây
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from main import DatabaseManager, RecurrenceRule, ReminderSystem
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Thời điểm bắt đầu mô phỏng (thứ Hai, 00:00)
+SIMULATION_START = datetime(2025, 1, 6)
+REMINDER_CHOICES = (0, 5, 10, 15, 30, 60, 120, 1440)
+
+
+def generate_events(count, burst, series, days, seed=0):
+    """Sinh các dict sự kiện cho add_events_many
+
+    Sự kiện đơn rải đều trên 2 * days ngày (nửa sau không đến hạn trong lúc mô
+    phỏng); burst sự kiện có nhắc rơi vào cùng một phút giữa kỳ mô phỏng; series
+    chuỗi lặp hằng ngày. Mọi nhắc đều sau SIMULATION_START.
+    """
+    rng = random.Random(seed)
+    span = days * 2 * 86400
+    burst_minute = SIMULATION_START + timedelta(seconds=days * 86400 // 2)
+    events = []
+
+    for index in range(count):
+        reminder_minutes = rng.choice(REMINDER_CHOICES)
+        if index < burst:
+            remind_at = burst_minute + timedelta(seconds=rng.randrange(60))
+        else:
+            remind_at = SIMULATION_START + timedelta(seconds=rng.randrange(60, span))
+        start = remind_at + timedelta(minutes=reminder_minutes)
+        end = start + timedelta(minutes=rng.choice((30, 60, 90))) if index % 2 else None
+        events.append({
+            "event": f"Sự kiện #{index}",
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat() if end else None,
+            "location": f"phòng {index % 500}",
+            "reminder_minutes": reminder_minutes,
+        })
+
+    for index in range(series):
+        reminder_minutes = rng.choice(REMINDER_CHOICES[:-1])
+        start = SIMULATION_START + timedelta(minutes=reminder_minutes, seconds=rng.randrange(60, 86400))
+        events.append({
+            "event": f"Chuỗi #{index}",
+            "start_time": start.isoformat(),
+            "end_time": None,
+            "location": "",
+            "reminder_minutes": reminder_minutes,
+            "recurrence": "FREQ=DAILY",
+        })
+
+    return events
+
+
+def expected_reminders(events, until):
+    """Thông báo mong đợi trong (SIMULATION_START, until] -> thời điểm nhắc"""
+    expected = {}
+    for event_data in events:
+        start = datetime.fromisoformat(event_data["start_time"])
+        reminder = timedelta(minutes=event_data["reminder_minutes"])
+        if event_data.get("recurrence"):
+            rule = RecurrenceRule.parse(event_data["recurrence"])
+            starts = rule.occurrences(start, window_end=until + reminder + timedelta(seconds=1))
+        else:
+            starts = (start,)
+        for occurrence_start in starts:
+            remind_at = occurrence_start - reminder
+            if SIMULATION_START < remind_at <= until:
+                occurrence = SimpleNamespace(name=event_data["event"], start=occurrence_start,
+                                             location=event_data["location"])
+                expected[ReminderSystem.format_message(occurrence)] = remind_at
+    return expected
+
+
+class BenchInstance:
+    """Một ReminderSystem như của một cửa sổ ứng dụng riêng
+
+    Có DatabaseManager (kết nối) riêng tới cùng file DB và chạy trên thread
+    riêng, nên việc giành nhắc giữa các instance đi qua khóa ghi của SQLite
+    giống hai tiến trình thật.
+    """
+
+    def __init__(self, db_path, callback, clock):
+        self.db_manager = DatabaseManager(db_path)
+        self.system = ReminderSystem(self.db_manager, callback, clock=clock)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, method, *args):
+        """Gọi method của ReminderSystem trên thread của instance"""
+        return self.executor.submit(getattr(self.system, method), *args)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.db_manager.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def simulate(instances, until, mode, step, fired):
+    """Chạy các ReminderSystem trên đồng hồ ảo đến until, trả về số lượt đánh thức
+
+    mode "wake" nhảy đồng hồ tới next_due() (tối đa MAX_WAIT_SECONDS) như thread
+    _check_reminders; mode "tick" tăng đồng hồ đều step giây. Mỗi lượt, các
+    instance chạy run_pending song song trên thread của mình rồi mới sang lượt sau.
+    """
+    now = SIMULATION_START
+    max_wait = timedelta(seconds=ReminderSystem.MAX_WAIT_SECONDS)
+    ticks = 0
+
+    while now < until:
+        if mode == "tick":
+            now = min(now + timedelta(seconds=step), until)
+        else:
+            futures = [instance.submit('next_due') for instance in instances]
+            next_due = min((due for due in (future.result() for future in futures) if due is not None),
+                           default=None)
+            wake_at = now + max_wait if next_due is None else min(next_due, now + max_wait)
+            now = min(max(wake_at, now + timedelta(seconds=1)), until)
+
+        fired.tick_now = now
+        fired.tick_started = time.perf_counter()
+        for future in [instance.submit('run_pending', now) for instance in instances]:
+            future.result()
+        ticks += 1
+
+    return ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=100000, help='số sự kiện đơn')
+    parser.add_argument('--burst', type=int, default=1000, help='số nhắc đến hạn trong cùng một phút')
+    parser.add_argument('--series', type=int, default=100, help='số chuỗi lặp hằng ngày')
+    parser.add_argument('--days', type=int, default=7, help='số ngày mô phỏng')
+    parser.add_argument('--instances', type=int, default=1,
+                        help='số ReminderSystem cùng file DB, mỗi cái một kết nối và thread (kiểm tra gửi trùng)')
+    parser.add_argument('--mode', choices=('wake', 'tick'), default='wake')
+    parser.add_argument('--step', type=int, default=60, help='bước đồng hồ (giây) cho --mode tick')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='không bật tracemalloc (số CPU sát thực tế hơn)')
+    args = parser.parse_args(argv)
+
+    until = SIMULATION_START + timedelta(days=args.days)
+    events = generate_events(args.events, min(args.burst, args.events), args.series, args.days, args.seed)
+    expected = expected_reminders(events, until)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench_reminders.db")
+        db_manager = DatabaseManager(db_path)
+        started = time.perf_counter()
+        db_manager.add_events_many(events)
+        print(f"Tạo {len(events)} sự kiện ({args.series} chuỗi lặp): {time.perf_counter() - started:.1f} s, "
+              f"{len(expected)} nhắc mong đợi trong {args.days} ngày")
+        db_manager.close()
+        del events
+
+        fired = SimpleNamespace(messages={}, latencies=[], tick_now=None, tick_started=0.0,
+                                lock=threading.Lock())
+
+        def callback(message):
+            # Độ trễ thực: từ lúc lượt đánh thức bắt đầu đến khi thông báo được gửi
+            latency = time.perf_counter() - fired.tick_started
+            with fired.lock:  # Gọi từ thread của nhiều instance cùng lúc
+                fired.latencies.append(latency)
+                fired.messages.setdefault(message, []).append(fired.tick_now)
+
+        instances = [BenchInstance(db_path, callback, clock=lambda: fired.tick_now)
+                     for _ in range(args.instances)]
+
+        if not args.no_memory:
+            tracemalloc.start()
+        cpu_started = time.process_time()
+        wall_started = time.perf_counter()
+        ticks = simulate(instances, until, args.mode, args.step, fired)
+        cpu = time.process_time() - cpu_started
+        wall = time.perf_counter() - wall_started
+        if not args.no_memory:
+            memory_current, memory_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        for instance in instances:
+            instance.close()
+
+    missed = [message for message in expected if message not in fired.messages]
+    duplicates = sum(len(times) - 1 for times in fired.messages.values())
+    unexpected = sum(1 for message in fired.messages if message not in expected)
+    lateness = sorted((times[0] - expected[message]).total_seconds()
+                      for message, times in fired.messages.items() if message in expected)
+    latencies = sorted(fired.latencies)
+
+    print(f"\nMô phỏng {args.days} ngày, {args.instances} instance, mode {args.mode}: "
+          f"{ticks} lượt đánh thức, {wall:.1f} s thực")
+    print(f"Đã gửi: {len(fired.messages)}/{len(expected)}, lỡ {len(missed)}, "
+          f"trùng {duplicates}, ngoài dự kiến {unexpected}")
+    print(f"Trễ theo đồng hồ ảo (s): p50 {percentile(lateness, 0.50):.0f}, "
+          f"p99 {percentile(lateness, 0.99):.0f}, max {lateness[-1] if lateness else 0:.0f}")
+    print(f"Trễ thực trong lượt (ms): p50 {percentile(latencies, 0.50) * 1000:.2f}, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f}, max {latencies[-1] * 1000 if latencies else 0:.2f}")
+    print(f"CPU: {cpu:.2f} s tổng, {cpu / args.days:.2f} s / ngày mô phỏng, "
+          f"{cpu / ticks * 1000 if ticks else 0:.3f} ms / lượt")
+    if not args.no_memory:
+        print(f"Bộ nhớ Python (tracemalloc): hiện tại {memory_current / 2**20:.1f} MiB, "
+              f"đỉnh {memory_peak / 2**20:.1f} MiB")
+    if resource is not None:
+        # ru_maxrss: KiB trên Linux, byte trên macOS; gồm cả bộ nhớ của SQLite
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"RSS tối đa của tiến trình: {maxrss / (2**20 if sys.platform == 'darwin' else 2**10):.1f} MiB")
+    for message in missed[:5]:
+        print(f"  ✗ lỡ: {message.splitlines()[0]} (nhắc lúc {expected[message]})")
+
+    return 1 if missed or duplicates else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,155 +1,322 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import sqlite3
 import json
+import textwrap
 import threading
 import time
-from underthesea import word_tokenize, ner
-from datetime import datetime, timedelta
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 import uuid
+import calendar
+import heapq
 import re
+import unicodedata
+from collections import OrderedDict, deque
+from functools import cached_property
+
+# Underthesea được nạp lười ở lần tách từ đầu tiên (hoặc warm-up nền sau khi
+# cửa sổ hiện lên) vì import thư viện và model làm chậm khởi động đáng kể
+_word_tokenize = None
+_word_tokenize_error = None
+_word_tokenize_lock = threading.Lock()
+tokenizer_load_seconds = None
+
+def get_word_tokenize():
+    """Trả về word_tokenize của Underthesea, nạp ở lần gọi đầu tiên"""
+    global _word_tokenize, _word_tokenize_error, tokenizer_load_seconds
+    if _word_tokenize is None and _word_tokenize_error is None:
+        with _word_tokenize_lock:
+            if _word_tokenize is None and _word_tokenize_error is None:
+                started = time.perf_counter()
+                try:
+                    from underthesea import word_tokenize
+                    # Gọi thử một lần để nạp model vào bộ nhớ
+                    word_tokenize("khởi động")
+                except Exception as e:
+                    _word_tokenize_error = e
+                else:
+                    _word_tokenize = word_tokenize
+                tokenizer_load_seconds = time.perf_counter() - started
+    if _word_tokenize_error is not None:
+        raise _word_tokenize_error
+    return _word_tokenize
+
+# Bộ câu kiểm thử NLP (dùng bởi ScheduleApp.test_nlp và bench_nlp.py)
+NLP_TEST_CASES = [
+    # 5 test case gốc (có lời nhắc)
+    "nhắc tôi họp nhóm lúc 10 giờ sáng mai ở phòng 302, nhắc trước 15 phút",
+    "nhac toi hop nhom luc 10 gio 30 sáng mai va ket thuc luc 12h o phong 302, nhac truoc 15 phut",
+    "nhắc tôi họp công ty lúc 10:30 thứ 2 tuần tới tại tầng trệt , nhắc trước 20 p",
+    "nhắc tôi họp công ty lúc 10:30 chủ nhật tuần sau tại tầng trệt , nhắc trước 20 p",
+    "nhắc tôi họp công ty lúc 9:30 cuối tuần tại tầng 5, nhắc trước 20 phút",
+    "Nhắc tôi họp lúc 8h30 sáng mai tại văn phòng, nhắc trước 30 phút",
+    "Nhắc tôi gọi điện cho khách hàng lúc 15 giờ ngày mai.",
+    "Nhac toi hop luc 10:00 thu Ba tuan sau, nhac truoc 1 gio",
+    "Nhắc tôi đi tập thể dục lúc 6 giờ sáng thứ Tư này.",
+    "Nhac toi nop bao cao luc 17h thu Sau, nhac truoc 2 gio", 
+    "Nhắc tôi họp nhóm lúc 14h30 chiều mai.",
+    "Nhắc tôi đón con lúc 11:45 trưa mai, nhắc trước 15 phút",
+    "Gap doi tac luc 9 gio sang thu Hai toi", 
+    "Nhắc tôi họp công ty lúc 13:00 ngày kia, nhắc trước 45 phút",
+    "Di kham benh luc 8 gio 15 phut sang thu Bay", 
+    "Nhắc tôi họp online lúc 20:00 tối nay, nhắc trước 10 phút",
+    "Nhắc tôi học bài lúc 19h30 tối thứ Năm.",
+    "Hop luc 10 gio sang cuoi tuan, nhac truoc 30 phut", 
+    "Nhắc tôi gửi email lúc 16h45 chiều thứ Tư.",
+    "Nhắc tôi họp lúc 9:00 sáng chủ nhật tuần này tại phòng E502, trường Đại học Sài Gòn, nhắc trước 1 giờ",
+    "Di sieu thi luc 10 gio 30 sang thu Bay", 
+    "Nhắc tôi họp lúc 11h trưa mai, nhắc trước 20 phút",
+    "Goi cho sep luc 15:30 chieu thu Sau", 
+    "Nhắc tôi họp tổng kết lúc 14 giờ thứ 4 3 tuần nữa, nhắc trước 1 giờ",
+    "Dam cuoi luc 17:00 thu Bay tuan sau", 
+    "Nhắc tôi họp lúc 8 giờ sáng thứ Hai tuần tới, nhắc trước 25 phút",
+    "Gap ban luc 18h30 toi thu Tu", 
+    "Nhắc tôi họp lúc 7:45 sáng mai, nhắc trước 15 phút",
+    "Nop bai luc 23:59 toi chu nhat", 
+    "Nhắc tôi họp lúc 12:00 trưa thứ Năm, nhắc trước 30 phút",
+    # Lặp lại
+    "họp hàng ngày 9h",
+    "tập thể dục hằng ngày 6h sáng",
+    "mỗi 2 tuần thứ 2 họp nhóm",
+    "hằng tháng ngày 5 nộp báo cáo",
+]
+
+class ParseContext:
+    """Ngữ cảnh phân tích dùng chung cho các bước trích xuất của một câu"""
+    
+    def __init__(self, text, normalized_text, processed_text=None, tokens=None):
+        self.text = text                        # Câu gốc
+        self.processed_text = processed_text if processed_text is not None else text
+        self.normalized_text = normalized_text  # Văn bản đã chuẩn hóa mà các extractor dùng
+        self.tokens = tokens or []              # Kết quả tách từ (rỗng nếu không tách từ)
+        self.times = None                       # Các token thời gian (kèm span), tính lười
+        self.reminder_span = None               # Span của lời nhắc, () nếu không có
 
 class VietnameseNLPProcessor:
     """Bộ xử lý NLP tiếng Việt"""
     
-    def __init__(self):
-        # Từ khóa để xác định các phần của câu (có dấu và không dấu)
-        self.reminder_patterns = [
-            # PHÚT - Có dấu
-            r'nhắc\s+(tôi|mình)?\s*trước\s*(\d+)\s*phút',
-            r'nhắc\s+nhở\s*trước\s*(\d+)\s*phút',
-            r'báo\s+trước\s*(\d+)\s*phút',
-            r'trước\s*(\d+)\s*phút',
-            
-            # PHÚT - Không dấu
-            r'nhac\s+(toi|minh)?\s*truoc\s*(\d+)\s*phut',
-            r'nhac\s+nho\s*truoc\s*(\d+)\s*phut',
-            r'bao\s*truoc\s*(\d+)\s*phut',
-            r'truoc\s*(\d+)\s*phut',
-            
-            # GIỜ - Có dấu
-            r'nhắc\s+(tôi|mình)?\s*trước\s*(\d+)\s*giờ',
-            r'nhắc\s+nhở\s*trước\s*(\d+)\s*giờ',
-            r'báo\s+trước\s*(\d+)\s*giờ',
-            r'trước\s*(\d+)\s*giờ',
-            
-            # GIỜ - Không dấu
-            r'nhac\s+(toi|minh)?\s*truoc\s*(\d+)\s*gio',
-            r'nhac\s+nho\s*truoc\s*(\d+)\s*gio',
-            r'bao\s*truoc\s*(\d+)\s*gio',
-            r'truoc\s*(\d+)\s*gio',
-            
-            # PHÚT - Viết tắt (p)
-            r'nhắc\s+(tôi|mình)?\s*trước\s*(\d+)\s*p',
-            r'nhắc\s+nhở\s*trước\s*(\d+)\s*p',
-            r'trước\s*(\d+)\s*p',
-            
-            # PHÚT - Không đơn vị (mặc định phút)
-            r'nhắc\s+(tôi|mình)?\s*trước\s*(\d+)',
-            r'nhắc\s+nhở\s*trước\s*(\d+)',
-            r'trước\s*(\d+)\s*$'
-        ]
+    # Từ viết tắt / không dấu -> dạng chuẩn (cụm dài đặt trước cụm ngắn cùng tiền tố)
+    NORMALIZE_WORDS = {
+        'nhắc tôi mình': 'nhắc', 'nhắc tôi': 'nhắc', 'nhắc mình': 'nhắc',
+        'nhac toi': 'nhắc', 'nhac minh': 'nhắc',
+        'nhac': 'nhắc', 'nahc': 'nhắc', 'truoc': 'trước',
+        'thu hai': 'thứ hai', 'thu ba': 'thứ ba', 'thu tu': 'thứ tư',
+        'thu nam': 'thứ năm', 'thu sau': 'thứ sáu', 'thu bay': 'thứ bảy',
+        'chu nhat': 'chủ nhật',
+    }
+    
+    # Đơn vị thời gian viết tắt -> dạng chuẩn
+    NORMALIZE_UNITS = {'gio': 'giờ', 'g': 'giờ', 'h': 'giờ', 'phut': 'phút', 'p': 'phút'}
+    
+    # Tất cả luật chuẩn hóa gộp thành một biểu thức, thứ tự nhánh là độ ưu tiên:
+    #   "thu hai toi" -> "thứ hai tuần tới"
+    #   "10 gio 30" / "8h30" -> "10:30" / "8:30" (kèm đơn vị của số phút nếu có)
+    #   "10h" / "20p" -> "10 giờ" / "20 phút"
+    #   "nhac toi" / "truoc" / "thu hai" -> "nhắc" / "trước" / "thứ hai"
+    NORMALIZE_RE = re.compile(
+        r'\bthu\s+(?P<weekday>[0-9]+|[a-z]+)\s+\btoi\b'
+        r'|(?P<hour>\d+)\s*(?:giờ|gio|g\b|h)\s*(?P<minute>\d+)(?:\s*(?P<minute_unit>gio|g|h|phut|p)\b|\b)'
+        r'|(?P<number>\d+)\s*(?P<unit>gio|g|h|phut|p)\b'
+        r'|\b(?P<word>' + '|'.join(map(re.escape, NORMALIZE_WORDS)) + r')\b'
+    )
+    
+    # Ngày trong tuần
+    WEEKDAY_MAP = {
+        'thứ 2': 0, 'thứ hai': 0, 
+        'thứ 3': 1, 'thứ ba': 1, 
+        'thứ 4': 2, 'thứ tư': 2, 
+        'thứ 5': 3, 'thứ năm': 3, 
+        'thứ 6': 4, 'thứ sáu': 4, 
+        'thứ 7': 5, 'thứ bảy': 5,
+        'chủ nhật': 6, 'cn': 6 
+    }
+    
+    # Gộp lại các số thời gian bị tách bởi dấu : sau khi tách từ ("9 : 30" -> "9:30")
+    TIME_COLON_RE = re.compile(r'(\d+)\s*:\s*(\d+)')
+    
+    # Đơn vị của thời gian nhắc nhở -> số phút
+    REMINDER_UNITS = {
+        'ngày': 1440, 'ngay': 1440,
+        'tiếng': 60, 'tieng': 60, 'giờ': 60, 'gio': 60,
+        'phút': 1, 'phut': 1, 'p': 1,
+    }
+    _REMINDER_UNIT = r'(?:' + '|'.join(REMINDER_UNITS) + r')\b'
+    
+    # Sau lượng thời gian mà còn buổi/ngày/giờ:phút thì đó là giờ của sự kiện
+    # ("nộp bài trước 10 giờ sáng mai"), không phải lời nhắc
+    _EVENT_TIME_FOLLOWS = (r'(?!\s*(?::|(?:sáng|trưa|chiều|tối|đêm|sang|trua|chieu|toi|dem'
+                           r'|thứ|thu|chủ nhật|chu nhat|mai|nay|hôm|hom|ngày|tuần|tuan'
+                           r'|cuối|cuoi|đầu|dau|giữa|giua)\b))')
+    
+    # Lời nhắc: [nhắc/báo (nhở/tôi/mình)] trước <lượng thời gian>, quét một lần, lấy match sớm nhất.
+    # Số không kèm đơn vị (mặc định phút) chỉ nhận khi có từ "nhắc/báo" hoặc ở cuối câu.
+    REMINDER_RE = re.compile(
+        r'(?P<cue>\b(?:nhắc|nhac|báo|bao)(?:\s+(?:nhở|nho|tôi|toi|mình|minh))?\s*)?'
+        r'\b(?:trước|truoc)\s*(?:'
+        r'(?P<hours>\d+):(?P<minutes>\d+)\s*(?:phút|phut|p)\b'
+        r'|(?P<amount>\d+\s*' + _REMINDER_UNIT + r'(?:\s*\d+\s*' + _REMINDER_UNIT + r')*'
+        + _EVENT_TIME_FOLLOWS + r'|\d+\b(?!\s*(?::|' + _REMINDER_UNIT + r'))' + _EVENT_TIME_FOLLOWS
+        + r'(?(cue)|(?=\s*$))))'
+    )
+    REMINDER_PART_RE = re.compile(r'(\d+)\s*(' + '|'.join(REMINDER_UNITS) + r')?')
+    
+    # Lặp lại: "mỗi thứ 2", "mỗi thứ 3 và thứ 5", "hàng ngày", "hằng tháng", "mỗi 2 tuần",
+    # "mỗi 2 tuần (vào) thứ 2", "hằng tháng (vào) ngày 5"
+    RECURRENCE_WEEKDAYS = {
+        '2': 0, 'hai': 0, '3': 1, 'ba': 1, '4': 2, 'tư': 2, 'tu': 2,
+        '5': 3, 'năm': 3, 'nam': 3, '6': 4, 'sáu': 4, 'sau': 4, '7': 5, 'bảy': 5, 'bay': 5,
+    }
+    RECURRENCE_UNITS = {
+        'ngày': 'DAILY', 'ngay': 'DAILY', 'tuần': 'WEEKLY', 'tuan': 'WEEKLY',
+        'tháng': 'MONTHLY', 'thang': 'MONTHLY',
+    }
+    _RECURRENCE_DAY = (r'(?:(?:thứ|thu)\s+(?:' + '|'.join(RECURRENCE_WEEKDAYS) + r')'
+                       r'|chủ\s+nhật|chu\s+nhat|cn)\b')
+    _RECURRENCE_DAYS = _RECURRENCE_DAY + r'(?:\s*(?:,|và|va)\s*' + _RECURRENCE_DAY + r')*'
+    RECURRENCE_RE = re.compile(
+        r'\b(?P<every>mỗi|moi|hàng|hang|hằng)\s+(?:'
+        r'(?P<days>' + _RECURRENCE_DAYS + r')'
+        r'|(?:(?P<interval>\d+)\s+)?(?P<unit>' + '|'.join(RECURRENCE_UNITS) + r')\b'
+        # Sau "tuần" có thể kèm các thứ, sau "tháng" có thể kèm ngày trong tháng (không
+        # phải ngày cụ thể như "ngày 5/6", "ngày 5 tháng 6" hay giờ "ngày 5 9:00")
+        r'(?:(?:(?<=tuần)|(?<=tuan))\s+(?:(?:vào|vao)\s+)?(?P<unit_days>' + _RECURRENCE_DAYS + r')'
+        r'|(?:(?<=tháng)|(?<=thang))\s+(?:(?:vào|vao)\s+)?(?:ngày|ngay)\s+(?P<monthday>\d{1,2})\b'
+        r'(?!\s*(?:[/.:-]\d|tháng|thang)))?)'
+    )
+    RECURRENCE_DAY_RE = re.compile(r'(?:thứ|thu)\s+(\w+)|(chủ\s+nhật|chu\s+nhat|cn)')
+    # "hàng" của từ ghép ("khách hàng ngày mai", "cửa hàng tuần sau") và cụm theo sau là
+    # ngày cụ thể ("mới tuần sau", "tháng 5") không phải lặp lại
+    RECURRENCE_COMPOUNDS = {'khách', 'khach', 'cửa', 'cua', 'ngân', 'ngan', 'đơn', 'don',
+                            'mặt', 'mat', 'giao'}
+    RECURRENCE_NOT_FOLLOWED = {'mai', 'kia', 'sau', 'tới', 'này', 'nay', 'trước', 'truoc'}
+    # Số ngay sau "ngày/tuần/tháng" là ngày cụ thể ("tháng 5", "ngày 5"), trừ khi là giờ ("hàng ngày 9h")
+    RECURRENCE_TIME_FOLLOWS_RE = re.compile(
+        r'\d+(?:\s*(?:giờ|gio\b|h\b|:)|\s+(?:sáng|chiều|tối|trưa|sang|chieu|toi|trua)\b)'
+    )
+    
+    # Lexer thời gian một lần quét: "10:30", "10 giờ", "10 sáng" (buổi tùy chọn).
+    # Số đơn lẻ cũng được match để các token không chồng lấn, nhưng bị bỏ qua.
+    TIME_TOKEN_RE = re.compile(
+        r'(?:(?P<clock_hour>\d+):(?P<clock_minute>\d+)'
+        r'|(?P<hour>\d+)(?:\s*(?P<unit>giờ|gio\b|h\b))?)'
+        r'(?:\s*(?P<period>sáng|chiều|tối|sang|chieu|toi)\b)?'
+    )
+    
+    def __init__(self, cache_size=256):
+        # Cache LRU template phân tích (không phụ thuộc now), khóa theo văn bản chuẩn hóa
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._parse_cache = OrderedDict()
+        self._parse_cache_lock = threading.Lock()
+        # Process pool của process_texts, tạo ở lần đầu cần và dùng lại giữa các lần gọi
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_warm = False
+        self._pool_lock = threading.Lock()
     
     def normalize_text(self, text):
         """Chuẩn hóa văn bản"""
         # Chuyển về chữ thường
         text = text.lower().strip()
         
-        # Thứ hai tới -> thứ 2 tuần tới
-        text = re.sub(r'\bthu\s+([0-9]+|[a-z]+)\s+\btoi\b', r'thứ \1 tuần tới', text)
-
-        # Chuẩn hóa các từ viết tắt (cả có dấu và không dấu)
-        text = re.sub(r'\bnhắc tôi\b', 'nhắc', text)
-        text = re.sub(r'\bnhắc mình\b', 'nhắc', text)
-        text = re.sub(r'\bnhac toi\b', 'nhắc', text)
-        text = re.sub(r'\bnhac minh\b', 'nhắc', text)
-        text = re.sub(r'\bnhac\b', 'nhắc', text)
-        text = re.sub(r'\bnahc\b', 'nhắc', text)
-        text = re.sub(r'\btruoc\b', 'trước', text)
-
-        # Chuẩn hóa thời gian
-        text = re.sub(r'(\d+)\s*gio\b', r'\1 giờ', text)
-        text = re.sub(r'(\d+)\s*g\b', r'\1 giờ', text)
-        text = re.sub(r'(\d+)\s*h\b', r'\1 giờ', text)
-        text = re.sub(r'(\d+)\s*phut\b', r'\1 phút', text)
-        text = re.sub(r'(\d+)\s*p\b', r'\1 phút', text)
-
-        #Chuẩn hóa thứ
-        text = re.sub(r'\bthu hai\b', 'thứ hai', text)
-        text = re.sub(r'\bthu ba\b', 'thứ ba', text)
-        text = re.sub(r'\bthu tu\b', 'thứ tư', text)
-        text = re.sub(r'\bthu nam\b', 'thứ năm', text)
-        text = re.sub(r'\bthu sau\b', 'thứ sáu', text)
-        text = re.sub(r'\bthu bay\b', 'thứ bảy', text)
-        text = re.sub(r'\bchu nhat\b', 'chủ nhật', text)
-        text = re.sub(r'\bchu nhat toi\b', 'chủ nhật tuần tới', text)
-        
-        #Chuyển "X giờ Y" thành "X:Y" trước khi xử lý khác
-        text = re.sub(r'(\d+)\s*(giờ|h|gio)\s*(\d+)\b', r'\1:\3', text)
-        
-        return text
+        # Áp dụng toàn bộ luật chuẩn hóa trong một lần quét
+        return self.NORMALIZE_RE.sub(self._normalize_match, text)
+    
+    @classmethod
+    def _normalize_match(cls, match):
+        """Thay thế một match của NORMALIZE_RE bằng dạng chuẩn"""
+        weekday = match.group('weekday')
+        if weekday is not None:
+            return f"thứ {cls.NORMALIZE_WORDS.get(weekday, weekday)} tuần tới"
+        
+        hour = match.group('hour')
+        if hour is not None:
+            minute_unit = match.group('minute_unit')
+            suffix = f" {cls.NORMALIZE_UNITS[minute_unit]}" if minute_unit else ''
+            return f"{hour}:{match.group('minute')}{suffix}"
+        
+        number = match.group('number')
+        if number is not None:
+            return f"{number} {cls.NORMALIZE_UNITS[match.group('unit')]}"
+        
+        return cls.NORMALIZE_WORDS[match.group('word')]
     
     def preprocess_text(self, text):
         """Tiền xử lý văn bản với hỗ trợ không dấu"""
         # Chuẩn hóa văn bản
         normalized_text = self.normalize_text(text)
         
+        processed_text, tokens = self._tokenize(normalized_text)
+        return processed_text
+    
+    def _tokenize(self, normalized_text):
+        """Tách từ văn bản đã chuẩn hóa, trả về (processed_text, tokens)"""
         # Sử dụng word_tokenize từ Underthesea để tách từ
         try:
-            tokens = word_tokenize(normalized_text)
+            tokens = get_word_tokenize()(normalized_text)
             processed_text = ' '.join(tokens)
             # Sửa lỗi: gộp lại các số thời gian bị tách bởi dấu :
             # Ví dụ: "9 : 30" → "9:30"
-            processed_text = re.sub(r'(\d+)\s*:\s*(\d+)', r'\1:\2', processed_text)
+            processed_text = self.TIME_COLON_RE.sub(r'\1:\2', processed_text)
         except:
             # Fallback: tự tách từ đơn giản nếu Underthesea lỗi
             processed_text = normalized_text
+            tokens = []
         
-        return processed_text
+        return processed_text, tokens
+    
+    def build_context(self, text):
+        """Tách từ rồi chuẩn hóa một lần, tạo ngữ cảnh cho tất cả extractor
+        
+        Chuẩn hóa chạy trên kết quả tách từ (không phải trước đó) vì các luật và
+        regex của extractor được viết cho dạng đã tách (dấu câu tách rời, "9 : 30"
+        đã gộp lại); kết quả chuẩn hóa được dùng làm normalized_text luôn.
+        """
+        processed_text, tokens = self._tokenize(self.cache_key(text))
+        return ParseContext(text, self.normalize_text(processed_text), processed_text, tokens)
+    
+    @staticmethod
+    def cache_key(text):
+        """Khóa cache phân tích: ngữ cảnh chỉ phụ thuộc vào câu đã viết thường"""
+        return text.lower().strip()
+    
+    def _text_context(self, text):
+        """Ngữ cảnh cho các hàm nhận chuỗi (không tách từ)"""
+        return ParseContext(text, self.normalize_text(text))
     
 
     def extract_reminder_minutes(self, text):
         """Trích xuất thời gian nhắc nhở"""
-        # Chuẩn hóa text trước khi xử lý
-        normalized_text = self.normalize_text(text)
+        return self.extract_reminder_minutes_from_context(self._text_context(text))
+    
+    def extract_reminder_minutes_from_context(self, context):
+        """Trích xuất thời gian nhắc nhở từ ngữ cảnh đã chuẩn hóa"""
+        match = self.REMINDER_RE.search(context.normalized_text)
+        context.reminder_span = match.span() if match else ()
+        if not match:
+            return 0
         
-        for pattern in self.reminder_patterns:
-            match = re.search(pattern, normalized_text, re.IGNORECASE)
-            if match:
-                # Lấy số từ group phù hợp
-                groups = match.groups()
-                for group in groups:
-                    if group and group.isdigit():
-                        number = int(group)
-                        
-                        # Kiểm tra đơn vị
-                        # Nếu pattern chứa "giờ" hoặc "gio" → nhân 60
-                        if re.search(r'giờ|gio', pattern, re.IGNORECASE):
-                            return number * 60
-                        # Nếu pattern chứa "phút", "phut", hoặc "p" → giữ nguyên
-                        elif re.search(r'phút|phut|p', pattern, re.IGNORECASE):
-                            return number
-                        else:
-                            # Mặc định là phút
-                            return number
-                
-                # Nếu không tìm thấy số trong groups, thử tìm trong toàn bộ match
-                full_match = re.search(r'(\d+)', match.group())
-                if full_match:
-                    number = int(full_match.group(1))
-                    # Kiểm tra đơn vị từ pattern
-                    if re.search(r'giờ|gio', pattern, re.IGNORECASE):
-                        return number * 60
-                    else:
-                        return number
-        
-        return 0
+        # "1 giờ 30 phút" đã được chuẩn hóa thành "1:30 phút"
+        if match.group('hours') is not None:
+            return int(match.group('hours')) * 60 + int(match.group('minutes'))
+        
+        # Cộng dồn các cặp số + đơn vị ("1 ngày", "1 tiếng 30 phút"), không đơn vị = phút
+        return sum(int(number) * self.REMINDER_UNITS.get(unit, 1)
+                   for number, unit in self.REMINDER_PART_RE.findall(match.group('amount')))
     
     def extract_event_name(self, text):
         """Trích xuất tên sự kiện"""
-        # Chuẩn hóa text
-        normalized_text = self.normalize_text(text)
-        clean_text = normalized_text
+        return self.extract_event_name_from_context(self._text_context(text))
+    
+    def extract_event_name_from_context(self, context):
+        """Trích xuất tên sự kiện từ ngữ cảnh đã chuẩn hóa"""
+        clean_text = context.normalized_text
         
         # Bước 1: Loại bỏ phần nhắc nhở
         clean_text = re.sub(r',\s*nhắc\s*(tôi|mình)?\s*trước\s*\d+\s*phút\s*\.?', '', clean_text)
@@ -157,9 +324,10 @@ class VietnameseNLPProcessor:
         clean_text = re.sub(r',\s*nhac\s*(toi|minh)?\s*truoc\s*\d+\s*phut\s*\.?', '', clean_text)
         clean_text = re.sub(r'\s*nhac\s*(toi|minh)?\s*truoc\s*\d+\s*phut\s*\.?$', '', clean_text)
         
-        # Bước 2: Loại bỏ "nhắc" ở đầu câu
+        # Bước 2: Loại bỏ "nhắc" ở đầu câu và cụm lặp lại ("mỗi thứ 2", "hàng ngày")
         clean_text = re.sub(r'^nhắc\s+', '', clean_text)
         clean_text = re.sub(r'^nhac\s+', '', clean_text)
+        clean_text = self.strip_recurrence(clean_text)
         
         # Bước 3: Tìm tất cả các từ khóa phân cách (thời gian và địa điểm)
         separator_patterns = [
@@ -222,7 +390,11 @@ class VietnameseNLPProcessor:
     
     def extract_location(self, text):
         """Trích xuất địa điểm"""
-        normalized_text = self.normalize_text(text)
+        return self.extract_location_from_context(self._text_context(text))
+    
+    def extract_location_from_context(self, context):
+        """Trích xuất địa điểm từ ngữ cảnh đã chuẩn hóa"""
+        normalized_text = self.strip_recurrence(context.normalized_text)
         
         # Pattern cải tiến: lấy toàn bộ phần sau "ở/tại" cho đến khi gặp dấu phẩy hoặc từ khóa thời gian
         location_patterns = [
@@ -249,23 +421,83 @@ class VietnameseNLPProcessor:
                         return location
         return ""
     
-    def parse_time(self, text):
+    def find_recurrence(self, text):
+        """Match RECURRENCE_RE đầu tiên thực sự là cụm lặp lại, None nếu không có"""
+        for match in self.RECURRENCE_RE.finditer(text):
+            before = text[:match.start()].split()
+            rest = text[match.end():].lstrip()
+            after = rest.split()
+            if match.group('every') in ('hàng', 'hang') and before and before[-1] in self.RECURRENCE_COMPOUNDS:
+                continue
+            if after and (after[0] in self.RECURRENCE_NOT_FOLLOWED
+                          or (match.group('unit') and after[0][0].isdigit()
+                              and not self.RECURRENCE_TIME_FOLLOWS_RE.match(rest))):
+                continue
+            return match
+        return None
+    
+    def strip_recurrence(self, text):
+        """Bỏ cụm lặp lại khỏi câu để không lẫn vào tên sự kiện/địa điểm"""
+        match = self.find_recurrence(text)
+        if match is None:
+            return text
+        return f"{text[:match.start()].rstrip()} {text[match.end():].lstrip()}".strip()
+    
+    def extract_recurrence(self, text):
+        """Trích xuất quy tắc lặp lại (chuỗi RRULE)"""
+        return self.extract_recurrence_from_context(self._text_context(text))
+    
+    def extract_recurrence_from_context(self, context):
+        """Quy tắc lặp lại từ ngữ cảnh đã chuẩn hóa, None nếu sự kiện không lặp"""
+        match = self.find_recurrence(context.normalized_text)
+        if match is None:
+            return None
+        
+        interval = match.group('interval') or 1
+        days = match.group('days') or match.group('unit_days')
+        if days:
+            byday = [6 if sunday else self.RECURRENCE_WEEKDAYS[weekday]
+                     for weekday, sunday in self.RECURRENCE_DAY_RE.findall(days)]
+            return str(RecurrenceRule('WEEKLY', interval=interval, byday=byday))
+        
+        monthday = match.group('monthday')
+        bymonthday = [int(monthday)] if monthday and 1 <= int(monthday) <= 31 else None
+        return str(RecurrenceRule(self.RECURRENCE_UNITS[match.group('unit')],
+                                  interval=interval, bymonthday=bymonthday))
+    
+    def parse_time(self, text, now=None):
         """Phân tích thời gian - Bổ sung hiểu ngày trong tuần"""
-        normalized_text = self.normalize_text(text)
-        now = datetime.now()
+        return self.parse_time_from_context(self._text_context(text), now)
+    
+    def parse_time_from_context(self, context, now=None):
+        """Phân tích thời gian từ ngữ cảnh đã chuẩn hóa"""
+        now = self.resolve_now(now)
         
         # Xác định ngày dựa trên các từ khóa đặc biệt
-        target_date = self.determine_target_date(normalized_text, now)
+        target_date = self.determine_target_date(context.normalized_text, now)
+        
+        return self.resolve_times(context, target_date, now)
+    
+    @staticmethod
+    def first_occurrence(recurrence, start_time, end_time, now):
+        """Chuỗi lặp bắt đầu từ lần lặp sớm nhất kể từ now ("mỗi thứ 2" khi hôm nay là thứ 4)"""
+        if not recurrence:
+            return start_time, end_time
+        first_start = next(RecurrenceRule.parse(recurrence).occurrences(start_time, now), start_time)
+        if end_time:
+            end_time += first_start - start_time
+        return first_start, end_time
+    
+    def resolve_times(self, context, target_date, now):
+        """Ghép giờ tìm được trong câu với ngày mục tiêu thành (start_time, end_time)"""
+        normalized_text = context.normalized_text
         
         # Tìm thời gian bắt đầu và kết thúc
         start_time = None
         end_time = None
         
-        # Tìm tất cả các thời gian trong câu
-        all_times = self.find_all_times(normalized_text)
-        
-        # Sắp xếp theo vị trí trong câu
-        all_times.sort(key=lambda x: x['position'])
+        # Token thời gian trong câu, đã theo thứ tự vị trí
+        all_times = self.find_context_times(context)
         
         # Thời gian đầu tiên là start_time
         if all_times:
@@ -302,94 +534,124 @@ class VietnameseNLPProcessor:
 
     def determine_target_date(self, text, now):
         """Xác định ngày mục tiêu dựa trên từ khóa"""
-        # Ngày trong tuần
-        weekday_map = {
-            'thứ 2': 0, 'thứ hai': 0, 
-            'thứ 3': 1, 'thứ ba': 1, 
-            'thứ 4': 2, 'thứ tư': 2, 
-            'thứ 5': 3, 'thứ năm': 3, 
-            'thứ 6': 4, 'thứ sáu': 4, 
-            'thứ 7': 5, 'thứ bảy': 5,
-            'chủ nhật': 6, 'cn': 6 
-        }
-        
-        current_weekday = now.weekday()
+        return self.anchor_date(self.relative_date(text), now)
+    
+    def relative_date(self, text):
+        """Biểu thức ngày tương đối trong câu, không phụ thuộc thời điểm hiện tại
         
+        Trả về một tuple:
+          ('weekday', thứ, số ngày cộng thêm)  - "thứ 2 tuần sau"
+          ('next', thứ, tính cả hôm nay)       - "cuối tuần", "đầu tuần", "giữa tuần"
+          ('days', số ngày)                    - "mai", "ngày kia", "nay"
+        """
         # Kiểm tra các trường hợp đặc biệt
-        for keyword, target_weekday in weekday_map.items():
+        for keyword, target_weekday in self.WEEKDAY_MAP.items():
             if keyword in text:
-                days_ahead = target_weekday - current_weekday
+                extra_days = 0
                 # Kiểm tra "tuần tới", "tuần sau"
                 if any(word in text for word in ['tuần sau', 'tuan sau']):
-                    days_ahead += 7
+                    extra_days += 7
                 if any(word in text for word in ['tuần tới',  'tuan toi']):
-                    days_ahead += 14
-                
-                return now + timedelta(days=days_ahead)
+                    extra_days += 14
+                return ('weekday', target_weekday, extra_days)
         
         # Cuối tuần (thứ 7 hoặc chủ nhật tuần này)
         if any(word in text for word in ['cuối tuần', 'cuoi tuan']):
-            days_to_saturday = 5 - current_weekday  # Thứ 7 = 5
-            if days_to_saturday < 0:
-                days_to_saturday += 7
-            return now + timedelta(days=days_to_saturday)
+            return ('next', 5, True)
         
         # Đầu tuần (thứ 2 tuần này hoặc tuần sau)
         if any(word in text for word in ['đầu tuần', 'dau tuan']):
-            days_to_monday = 0 - current_weekday  # Thứ 2 = 0
-            if days_to_monday <= 0:
-                days_to_monday += 7
-            return now + timedelta(days=days_to_monday)
+            return ('next', 0, False)
         
-        # Giữa tuần (thứ 3, 4, 5)
+        # Giữa tuần (thứ 3, 4, 5) - mặc định là thứ 4
         if any(word in text for word in ['giữa tuần', 'giua tuan']):
-            # Mặc định là thứ 4
-            days_to_wednesday = 2 - current_weekday  # Thứ 4 = 2
-            if days_to_wednesday <= 0:
-                days_to_wednesday += 7
-            return now + timedelta(days=days_to_wednesday)
+            return ('next', 2, False)
         
         # Ngày mai
         if any(word in text for word in ['mai', 'ngày mai']):
-            return now + timedelta(days=1)
+            return ('days', 1)
         
         if any(word in text for word in ['ngày kia']):
-            return now + timedelta(days=2)
-        
-        # Hôm nay
-        if any(word in text for word in ['nay', 'hôm nay']):
-            return now
+            return ('days', 2)
         
-        # Mặc định là hôm nay
+        # Hôm nay / mặc định là hôm nay
+        return ('days', 0)
+    
+    def anchor_date(self, expression, now):
+        """Gắn biểu thức ngày tương đối vào thời điểm now"""
+        kind = expression[0]
+        
+        if kind == 'weekday':
+            _, target_weekday, extra_days = expression
+            return now + timedelta(days=target_weekday - now.weekday() + extra_days)
+        
+        if kind == 'next':
+            _, target_weekday, include_today = expression
+            days_ahead = target_weekday - now.weekday()
+            if days_ahead < 0 or (days_ahead == 0 and not include_today):
+                days_ahead += 7
+            return now + timedelta(days=days_ahead)
+        
+        return now + timedelta(days=expression[1])
+    
+    @staticmethod
+    def resolve_now(now=None):
+        """Thời điểm tham chiếu: None = đồng hồ hệ thống, callable = đồng hồ tùy biến"""
+        if now is None:
+            return datetime.now()
+        if callable(now):
+            return now()
         return now
 
     def find_all_times(self, text):
-        """Tìm tất cả các thời gian trong câu"""
-        all_times = []
-        
-        # Pattern để tìm tất cả thời gian - THÊM PATTERN MỚI
-        time_patterns = [
-            r'(?:lúc|vào|luc|vao)?\s*(\d+)\s*(sáng|chiều|tối|sang|chieu|toi)',
-            r'(\d+)\s*(giờ|h|gio)\s*(sáng|chiều|tối|sang|chieu|toi)?',
-            r'(\d+):(\d+)',
-            r'(\d+)\s*h\b'
-        ]
+        """Tìm tất cả các thời gian trong câu (theo thứ tự xuất hiện, không chồng lấn)"""
+        return self.lex_times(text)
+    
+    def lex_times(self, text, skip_spans=()):
+        """Quét câu một lần, trả về các token thời gian có kiểu và span
         
-        for pattern in time_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                hour, minute = self.extract_hour_minute(match)
-                if hour is not None:
-                    all_times.append({
-                        'hour': hour,
-                        'minute': minute,
-                        'position': match.start(),
-                        'text': match.group(),
-                        'pattern': pattern
-                    })
+        Kiểu token: 'clock' ("10:30 [chiều]"), 'hour_period' ("10 sáng"),
+        'hour' ("10 giờ [sáng]"). Bỏ qua token nằm trong skip_spans
+        (ví dụ "1 giờ" của lời nhắc "nhắc trước 1 giờ").
+        """
+        all_times = []
+        for match in self.TIME_TOKEN_RE.finditer(text):
+            start, end = match.span()
+            if any(start < skip_end and skip_start < end for skip_start, skip_end in skip_spans):
+                continue
+            
+            if match.group('clock_hour') is not None:
+                token_type = 'clock'
+            elif match.group('unit') is not None:
+                token_type = 'hour'
+            elif match.group('period') is not None:
+                token_type = 'hour_period'
+            else:
+                continue  # Số đơn lẻ ("phòng 302", "thứ 2") không phải thời gian
+            
+            hour, minute = self.extract_hour_minute(match)
+            if hour is not None:
+                all_times.append({
+                    'hour': hour,
+                    'minute': minute,
+                    'position': start,
+                    'span': (start, end),
+                    'text': match.group(),
+                    'type': token_type
+                })
         
         return all_times
 
+    def find_context_times(self, context):
+        """Các thời gian trong ngữ cảnh theo vị trí (tính một lần rồi dùng lại)"""
+        if context.times is None:
+            # Dùng lại span lời nhắc đã tìm để không lấy "trước 1 giờ" làm giờ sự kiện
+            if context.reminder_span is None:
+                self.extract_reminder_minutes_from_context(context)
+            skip_spans = [context.reminder_span] if context.reminder_span else ()
+            context.times = self.lex_times(context.normalized_text, skip_spans)
+        return context.times
+    
     def is_special_date_keyword(self, text):
         """Kiểm tra xem có từ khóa ngày đặc biệt không"""
         special_keywords = [
@@ -402,42 +664,30 @@ class VietnameseNLPProcessor:
         return any(keyword in text for keyword in special_keywords)
     
     def extract_hour_minute(self, match):
-        """Trích xuất giờ và phút từ match object - FIXED"""
-        hour, minute = None, 0
-        
-        if match:
-            groups = match.groups()
-            
-            # Pattern 1: "10:30"
-            if len(groups) >= 2 and groups[0] and groups[0].isdigit() and groups[1] and groups[1].isdigit():
-                if ':' in match.group():
-                    hour = int(groups[0])
-                    minute = int(groups[1])
-                    # Kiểm tra giờ hợp lệ (0-23)
-                    if 0 <= hour <= 23:
-                        return hour, minute
-                    return None, 0
-            
-            # Pattern 2: "10 sáng" 
-            elif len(groups) >= 2 and groups[0] and groups[0].isdigit():
-                hour = int(groups[0])
-                if len(groups) >= 2 and groups[1] and groups[1] in ['sáng', 'chiều', 'tối', 'sang', 'chieu', 'toi']:
-                    # KIỂM TRA: "30 sáng" là không hợp lệ (giờ không thể là 30)
-                    if hour > 12:  # Giờ không hợp lệ cho pattern này
-                        return None, 0
-                    period = groups[1]
-                    hour = self.adjust_hour_for_period(hour, period)
-                    return hour, minute
-            
-            # Pattern 3: "10 giờ"
-            elif len(groups) >= 1 and groups[0] and groups[0].isdigit():
-                hour = int(groups[0])
-                if len(groups) >= 3 and groups[2] and groups[2] in ['sáng', 'chiều', 'tối', 'sang', 'chieu', 'toi']:
-                    period = groups[2]
-                    hour = self.adjust_hour_for_period(hour, period)
-                    return hour, minute
-        
-        return hour, minute
+        """Trích xuất giờ và phút từ một match của TIME_TOKEN_RE"""
+        period = match.group('period')
+        
+        # "10:30" (có thể kèm buổi)
+        if match.group('clock_hour') is not None:
+            hour = int(match.group('clock_hour'))
+            minute = int(match.group('clock_minute'))
+            # Kiểm tra giờ hợp lệ (0-23)
+            if not 0 <= hour <= 23:
+                return None, 0
+            if period:
+                hour = self.adjust_hour_for_period(hour, period)
+            return hour, minute
+        
+        hour = int(match.group('hour'))
+        
+        # "10 sáng": "30 sáng" là không hợp lệ (giờ không thể là 30)
+        if match.group('unit') is None and hour > 12:
+            return None, 0
+        
+        # "10 giờ", "10 giờ tối", "10 sáng"
+        if period:
+            hour = self.adjust_hour_for_period(hour, period)
+        return hour, 0
     
     def adjust_hour_for_period(self, hour, period):
         """Điều chỉnh giờ theo buổi trong ngày"""
@@ -449,21 +699,43 @@ class VietnameseNLPProcessor:
             return 0
         return hour
     
-    def process_text(self, text):
-        """Xử lý toàn bộ văn bản"""
+    def process_text(self, text, now=None):
+        """Xử lý toàn bộ văn bản
+        
+        now: thời điểm tham chiếu (datetime) hoặc đồng hồ (callable trả về datetime),
+        mặc định là datetime.now().
+        """
         try:
-            # Component 1: Preprocessing
-            processed_text = self.preprocess_text(text)
-            
-            # Component 2: Trích xuất thông tin
-            event_name = self.extract_event_name(processed_text)
-            
-            location = self.extract_location(processed_text)
+            now = self.resolve_now(now)
+            # Câu lặp lại: dùng lại template đã phân tích, chỉ gắn lại vào thời điểm now
+            cache_key = self.cache_key(text)
+            entry = self._cache_get(cache_key)
+            if entry is None:
+                # Component 1: Preprocessing (tách từ + chuẩn hóa một lần)
+                context = self.build_context(text)
+                
+                # Component 2: Trích xuất thông tin
+                event_name = self.extract_event_name_from_context(context)
+                
+                location = self.extract_location_from_context(context)
+                
+                reminder_minutes = self.extract_reminder_minutes_from_context(context)
+                
+                recurrence = self.extract_recurrence_from_context(context)
+                
+                # Biểu thức ngày tương đối và các token giờ không phụ thuộc now
+                relative_date = self.relative_date(context.normalized_text)
+                self.find_context_times(context)
+                
+                entry = (context, event_name, location, reminder_minutes, recurrence, relative_date)
+                self._cache_put(cache_key, entry)
             
-            reminder_minutes = self.extract_reminder_minutes(processed_text)
+            context, event_name, location, reminder_minutes, recurrence, relative_date = entry
             
-            # Component 3: Phân tích thời gian
-            start_time, end_time = self.parse_time(processed_text)
+            # Component 3: Phân tích thời gian (gắn template vào thời điểm now)
+            target_date = self.anchor_date(relative_date, now)
+            start_time, end_time = self.resolve_times(context, target_date, now)
+            start_time, end_time = self.first_occurrence(recurrence, start_time, end_time, now)
             
             # Component 4: Hợp nhất kết quả
             result = {
@@ -471,119 +743,1253 @@ class VietnameseNLPProcessor:
                 "start_time": start_time.isoformat(),
                 "end_time": end_time.isoformat() if end_time else None,
                 "location": location,
-                "reminder_minutes": reminder_minutes
+                "reminder_minutes": reminder_minutes,
+                "recurrence": recurrence
             }
             return result
             
         except Exception as e:
             return {"error": f"Lỗi xử lý: {str(e)}"}
+    
+    def _cache_get(self, key):
+        with self._parse_cache_lock:
+            entry = self._parse_cache.get(key)
+            if entry is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+                self._parse_cache.move_to_end(key)
+            return entry
+    
+    def _cache_put(self, key, entry):
+        if self.cache_size <= 0:
+            return
+        with self._parse_cache_lock:
+            self._parse_cache[key] = entry
+            self._parse_cache.move_to_end(key)
+            while len(self._parse_cache) > self.cache_size:
+                self._parse_cache.popitem(last=False)
+    
+    def cache_info(self):
+        """Thống kê cache phân tích: hits, misses, size, maxsize"""
+        with self._parse_cache_lock:
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "size": len(self._parse_cache),
+                "maxsize": self.cache_size
+            }
+    
+    def clear_cache(self):
+        """Xóa toàn bộ cache phân tích (ví dụ sau khi đổi luật chuẩn hóa)"""
+        with self._parse_cache_lock:
+            self._parse_cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+    
+    # Đo trên một lõi: mỗi worker "spawn" mất khoảng 2 s để import main và nạp
+    # Underthesea, trong khi xử lý tại chỗ đạt khoảng 1000 câu/s. Với n worker,
+    # pool mới chỉ có lợi khi N / 1000 > 2 + N / (1000 n), tức N > 4000 khi n = 2
+    # (ít hơn khi n lớn hơn), nên lô nhỏ hơn mức này xử lý tại chỗ. Pool đã nóng
+    # thì chỉ còn chi phí gửi/nhận chunk, vài chunk là đã có lợi.
+    PARALLEL_MIN_TEXTS = 4000
+    PARALLEL_MIN_TEXTS_WARM = 200
+    CHUNK_SIZE_MAX = 1000
+    
+    def process_texts(self, texts, workers=None, chunk_size=None, now=None):
+        """Xử lý nhiều câu song song bằng process pool
+        
+        Kết quả trả về theo đúng thứ tự đầu vào; lỗi được báo riêng cho
+        từng câu dưới dạng {"error": ...} như process_text. Cả lô dùng chung
+        một thời điểm tham chiếu now (datetime hoặc callable).
+        
+        Số worker không vượt quá số lõi CPU. Pool được giữ lại cho các lần gọi
+        sau (worker đã nạp tokenizer), gọi close() khi không dùng nữa.
+        """
+        texts = list(texts)
+        now = self.resolve_now(now)
+        workers = min(workers or os.cpu_count() or 1, os.cpu_count() or 1)
+        if chunk_size is None:
+            # Khoảng 4 chunk cho mỗi worker để cân bằng tải
+            chunk_size = max(1, min(self.CHUNK_SIZE_MAX, -(-len(texts) // (workers * 4))))
+        
+        # Lô nhỏ hoặc 1 worker: xử lý tại chỗ, tránh chi phí tạo process
+        min_texts = self.PARALLEL_MIN_TEXTS_WARM if self.pool_workers == workers else self.PARALLEL_MIN_TEXTS
+        if workers <= 1 or len(texts) < min_texts or len(texts) <= chunk_size:
+            return [self.process_text(text, now) for text in texts]
+        
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        results = []
+        pool = self._get_pool(workers)
+        futures = [pool.submit(_process_nlp_chunk, chunk, now) for chunk in chunks]
+        broken = False
+        for chunk, future in zip(chunks, futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                # Worker lỗi (ví dụ process bị chết): báo lỗi cho từng câu trong chunk
+                broken = broken or isinstance(e, BrokenProcessPool)
+                results.extend({"error": f"Lỗi xử lý: {str(e)}"} for _ in chunk)
+        
+        with self._pool_lock:
+            if pool is self._pool:
+                if broken:
+                    # Pool hỏng không nhận việc nữa, lần sau tạo pool mới
+                    self._pool = None
+                    self._pool_workers = 0
+                    self._pool_warm = False
+                else:
+                    self._pool_warm = True
+        if broken:
+            pool.shutdown(wait=False)
+        return results
+    
+    @property
+    def pool_workers(self):
+        """Số worker của pool đã nóng (0 nếu chưa có pool hoặc pool chưa chạy xong lô nào)"""
+        return self._pool_workers if self._pool_warm else 0
+    
+    def _get_pool(self, workers):
+        """Pool với đúng số worker, tạo mới (thay pool cũ) khi cần"""
+        with self._pool_lock:
+            if self._pool is not None and self._pool_workers != workers:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                # "spawn" thay vì fork mặc định trên Linux: fork từ tiến trình đang có thread
+                # (Tk, worker DB, nhắc nhở) có thể sao chép cả lock đang bị giữ sang worker
+                self._pool = ProcessPoolExecutor(max_workers=workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_nlp_worker,
+                                                 initargs=(self.cache_size,))
+                self._pool_workers = workers
+                self._pool_warm = False
+            return self._pool
+    
+    def close(self):
+        """Dừng process pool của process_texts (nếu có)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            self._pool_workers = 0
+            self._pool_warm = False
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+# Bộ xử lý NLP riêng của mỗi worker process (tạo một lần trong initializer)
+_worker_nlp_processor = None
+
+def _init_nlp_worker(cache_size):
+    """Khởi tạo bộ xử lý (cùng cache_size với bên gọi) và nạp tokenizer một lần cho mỗi worker"""
+    global _worker_nlp_processor
+    _worker_nlp_processor = VietnameseNLPProcessor(cache_size=cache_size)
+    try:
+        get_word_tokenize()
+    except Exception:
+        pass  # preprocess_text sẽ dùng fallback không tách từ
+
+def _process_nlp_chunk(texts, now):
+    """Xử lý một nhóm câu trong worker process"""
+    return [_worker_nlp_processor.process_text(text, now) for text in texts]
+
+class RecurrenceRule:
+    """Quy tắc lặp lại, tập con của RRULE trong iCalendar (RFC 5545)
+    
+    Hỗ trợ FREQ=DAILY/WEEKLY/MONTHLY, INTERVAL, BYDAY (chỉ với WEEKLY, không
+    kèm số thứ tự như 1MO), BYMONTHDAY (chỉ với MONTHLY, ngày 1-31), COUNT và
+    UNTIL. Các lần lặp được sinh lười theo cửa sổ thời gian cần xem, không bao
+    giờ trải hết chuỗi ra bộ nhớ.
+    """
+    
+    FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+    WEEKDAY_CODES = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+    WEEKDAY_NAMES = ('thứ 2', 'thứ 3', 'thứ 4', 'thứ 5', 'thứ 6', 'thứ 7', 'chủ nhật')
+    # MONTHLY vào ngày 31 mà liên tiếp nhiều tháng không có ngày đó thì coi như hết chuỗi
+    MAX_EMPTY_PERIODS = 48
+    
+    def __init__(self, freq, interval=1, byday=None, count=None, until=None, bymonthday=None):
+        if freq not in self.FREQUENCIES:
+            raise ValueError(f"Không hỗ trợ FREQ={freq}")
+        self.freq = freq
+        self.interval = max(1, int(interval))
+        self.byday = tuple(sorted(set(byday))) if byday and freq == 'WEEKLY' else None
+        self.bymonthday = tuple(sorted(set(bymonthday))) if bymonthday and freq == 'MONTHLY' else None
+        self.count = int(count) if count else None
+        self.until = until
+    
+    @classmethod
+    def parse(cls, text):
+        """Đọc chuỗi RRULE, ví dụ "FREQ=WEEKLY;BYDAY=MO,WE" (có thể có tiền tố "RRULE:")"""
+        text = text.strip()
+        if text.upper().startswith('RRULE:'):
+            text = text[6:]
+        parts = {}
+        for part in text.split(';'):
+            key, _, value = part.partition('=')
+            if key.strip():
+                parts[key.strip().upper()] = value.strip().upper()
+        
+        byday = None
+        if parts.get('BYDAY'):
+            try:
+                byday = [cls.WEEKDAY_CODES.index(code) for code in parts['BYDAY'].split(',')]
+            except ValueError:
+                raise ValueError(f"Không hỗ trợ BYDAY={parts['BYDAY']}")
+        
+        bymonthday = None
+        if parts.get('BYMONTHDAY'):
+            try:
+                bymonthday = [int(day) for day in parts['BYMONTHDAY'].split(',')]
+            except ValueError:
+                bymonthday = [0]
+            if not all(1 <= day <= 31 for day in bymonthday):
+                raise ValueError(f"Không hỗ trợ BYMONTHDAY={parts['BYMONTHDAY']}")
+        
+        until = None
+        if parts.get('UNTIL'):
+            value = parts['UNTIL'].rstrip('Z')
+            until = datetime.strptime(value, "%Y%m%d" if len(value) == 8 else "%Y%m%dT%H%M%S")
+            if len(value) == 8:
+                until += timedelta(days=1, seconds=-1)  # UNTIL là ngày: tính hết ngày đó
+        
+        return cls(parts.get('FREQ'), parts.get('INTERVAL') or 1, byday, parts.get('COUNT'), until,
+                   bymonthday)
+    
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval > 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(self.WEEKDAY_CODES[day] for day in self.byday))
+        if self.bymonthday:
+            parts.append("BYMONTHDAY=" + ",".join(str(day) for day in self.bymonthday))
+        if self.count:
+            parts.append(f"COUNT={self.count}")
+        if self.until:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%S')}")
+        return ";".join(parts)
+    
+    def describe(self):
+        """Mô tả tiếng Việt, ví dụ: mỗi tuần (thứ 2, thứ 4); mỗi tháng (ngày 5); mỗi 2 ngày, 10 lần"""
+        unit = {'DAILY': 'ngày', 'WEEKLY': 'tuần', 'MONTHLY': 'tháng'}[self.freq]
+        text = f"mỗi {self.interval} {unit}" if self.interval > 1 else f"mỗi {unit}"
+        if self.byday:
+            text += " (" + ", ".join(self.WEEKDAY_NAMES[day] for day in self.byday) + ")"
+        if self.bymonthday:
+            text += " (ngày " + ", ".join(str(day) for day in self.bymonthday) + ")"
+        if self.count:
+            text += f", {self.count} lần"
+        if self.until:
+            text += f", đến {self.until:%d/%m/%Y}"
+        return text
+    
+    def _period(self, dtstart, index):
+        """Các lần lặp (chưa lọc) trong chu kỳ thứ index tính từ dtstart"""
+        if self.freq == 'DAILY':
+            return [dtstart + timedelta(days=index * self.interval)]
+        
+        if self.freq == 'WEEKLY':
+            week = dtstart - timedelta(days=dtstart.weekday()) + timedelta(weeks=index * self.interval)
+            return [week + timedelta(days=day) for day in self.byday or (dtstart.weekday(),)]
+        
+        month = dtstart.month - 1 + index * self.interval
+        year, month = dtstart.year + month // 12, month % 12 + 1
+        # Bỏ các ngày tháng này không có (31/4, 30/2...)
+        days_in_month = calendar.monthrange(year, month)[1]
+        return [dtstart.replace(year=year, month=month, day=day)
+                for day in self.bymonthday or (dtstart.day,) if day <= days_in_month]
+    
+    def _first_period(self, dtstart, window_start):
+        """Chu kỳ đầu tiên có thể chứa lần lặp >= window_start (nhảy cóc, không duyệt từ đầu)"""
+        if window_start is None or window_start <= dtstart:
+            return 0
+        if self.freq == 'DAILY':
+            return (window_start - dtstart).days // self.interval
+        if self.freq == 'WEEKLY':
+            week = dtstart - timedelta(days=dtstart.weekday())
+            return (window_start - week).days // 7 // self.interval
+        months = (window_start.year - dtstart.year) * 12 + window_start.month - dtstart.month
+        return months // self.interval
+    
+    def occurrences(self, dtstart, window_start=None, window_end=None, exdates=()):
+        """Sinh lười thời điểm bắt đầu các lần lặp trong [window_start, window_end)
+        
+        dtstart là lần đầu của chuỗi; exdates là tập các lần bị hủy (vẫn được
+        tính vào COUNT như RFC 5545). Không có window_end, COUNT và UNTIL thì
+        generator là vô hạn, người gọi tự dừng.
+        """
+        # Có COUNT thì phải đếm từ đầu chuỗi; không có thì nhảy thẳng tới cửa sổ
+        index = 0 if self.count else self._first_period(dtstart, window_start)
+        produced = 0
+        empty_periods = 0
+        
+        while True:
+            candidates = self._period(dtstart, index)
+            index += 1
+            if not candidates:
+                empty_periods += 1
+                if empty_periods > self.MAX_EMPTY_PERIODS:
+                    return
+                continue
+            empty_periods = 0
+            
+            for occurrence in candidates:
+                if occurrence < dtstart:
+                    continue
+                if self.until is not None and occurrence > self.until:
+                    return
+                produced += 1
+                if self.count and produced > self.count:
+                    return
+                if window_end is not None and occurrence >= window_end:
+                    return
+                if window_start is not None and occurrence < window_start:
+                    continue
+                if occurrence in exdates:
+                    continue
+                yield occurrence
+    
+    def last_start(self, dtstart):
+        """Lần lặp cuối cùng (hoặc cận trên với UNTIL), None nếu chuỗi vô hạn"""
+        if self.count:
+            last = None
+            for last in self.occurrences(dtstart):
+                pass
+            return last
+        return self.until
+
+class EventRow(tuple):
+    """Một dòng của bảng events
+    
+    Vẫn là tuple 7 cột (id, event_name, start_time, end_time, location,
+    reminder_minutes, created_at) như trước nên code cũ unpack được. Thêm
+    start_ts/end_ts (epoch) và start/end là datetime tính lười từ epoch khi
+    cần, thay vì parse chuỗi ISO ở mọi nơi đọc. Sự kiện lặp lại có rrule
+    (RRULE) và exdates (các lần bị hủy, chuỗi ISO cách nhau bởi dấu phẩy).
+    """
+    
+    EPOCH = datetime(1970, 1, 1)
+    
+    def __new__(cls, values, start_ts=None, end_ts=None, rrule=None, exdates=None):
+        row = super().__new__(cls, values)
+        row.start_ts = start_ts
+        row.end_ts = end_ts
+        row.rrule = rrule
+        row.exdates = exdates
+        return row
+    
+    @classmethod
+    def from_cursor(cls, cursor, row):
+        """row_factory cho các truy vấn SELECT DatabaseManager.EVENT_COLUMNS"""
+        return cls(row[:7], row[7], row[8], row[9], row[10])
+    
+    @property
+    def id(self):
+        return self[0]
+    
+    @property
+    def name(self):
+        return self[1]
+    
+    @property
+    def location(self):
+        return self[4]
+    
+    @property
+    def reminder_minutes(self):
+        return self[5]
+    
+    @cached_property
+    def start(self):
+        if self.start_ts is None:
+            return datetime.fromisoformat(self[2])
+        return self.EPOCH + timedelta(seconds=self.start_ts)
+    
+    @cached_property
+    def end(self):
+        if self[3] is None:
+            return None
+        if self.end_ts is None:
+            return datetime.fromisoformat(self[3])
+        return self.EPOCH + timedelta(seconds=self.end_ts)
+    
+    @cached_property
+    def recurrence(self):
+        """RecurrenceRule của chuỗi lặp, None nếu là sự kiện đơn (hoặc RRULE không đọc được)"""
+        if not self.rrule:
+            return None
+        try:
+            return RecurrenceRule.parse(self.rrule)
+        except ValueError as e:
+            print(f"Bỏ qua quy tắc lặp của sự kiện #{self.id}: {e}")
+            return None
+    
+    @cached_property
+    def excluded_starts(self):
+        """Tập thời điểm bắt đầu của các lần lặp đã bị hủy"""
+        if not self.exdates:
+            return frozenset()
+        return frozenset(datetime.fromisoformat(value) for value in self.exdates.split(',') if value)
+    
+    def occurrence_at(self, start):
+        """Bản sao của sự kiện dời sang lần lặp bắt đầu lúc start (cùng id với chuỗi)"""
+        end = start + (self.end - self.start) if self.end else None
+        values = (self[0], self[1], start.isoformat(), end.isoformat() if end else None,
+                  self[4], self[5], self[6])
+        return EventRow(values, calendar.timegm(start.utctimetuple()),
+                        calendar.timegm(end.utctimetuple()) if end else None,
+                        self.rrule, self.exdates)
+    
+    def occurrences(self, window_start=None, window_end=None):
+        """Sinh lười các lần diễn ra giao với [window_start, window_end)
+        
+        Sự kiện đơn cho ra chính nó (nếu giao với cửa sổ); chuỗi lặp cho ra
+        từng lần lặp qua occurrence_at, theo thứ tự thời gian.
+        """
+        rule = self.recurrence
+        if rule is None:
+            if ((window_end is None or self.start < window_end)
+                    and (window_start is None or self.start >= window_start
+                         or (self.end is not None and self.end > window_start))):
+                yield self
+            return
+        
+        # Lần lặp bắt đầu trước cửa sổ nhưng chưa kết thúc vẫn giao với cửa sổ
+        duration = self.end - self.start if self.end else timedelta(0)
+        lower = window_start - duration if window_start is not None else None
+        for start in rule.occurrences(self.start, lower, window_end, self.excluded_starts):
+            if duration and window_start is not None and start + duration <= window_start:
+                continue
+            yield self.occurrence_at(start)
 
 class DatabaseManager:
-    """Quản lý cơ sở dữ liệu SQLite"""
+    """Quản lý cơ sở dữ liệu SQLite
+    
+    Mỗi thread (Tk, worker, ReminderSystem) giữ một kết nối riêng, mở một lần
+    và dùng lại. WAL cho phép đọc song song với ghi, busy_timeout chờ khóa thay
+    vì báo lỗi "database is locked". Câu SQL là hằng số của lớp nên sqlite3 dùng
+    lại prepared statement từ cache của kết nối.
+    """
+    
+    BUSY_TIMEOUT_MS = 5000
+    STATEMENT_CACHE_SIZE = 64
+    
+    # Cột đọc ra cho EventRow: 7 cột cũ + epoch (start_ts, end_ts) + quy tắc lặp
+    EVENT_COLUMNS = '''events.id, events.event_name, events.start_time, events.end_time,
+        events.location, events.reminder_minutes, events.created_at,
+        events.start_ts, events.end_ts, events.rrule, events.exdates'''
+    
+    INSERT_EVENT_SQL = '''
+        INSERT INTO events (event_name, start_time, end_time, location, reminder_minutes,
+                            start_ts, end_ts, rrule, exdates, until_ts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    # Dùng cho nhập hàng loạt: giữ created_at của bản sao lưu nếu có
+    INSERT_EVENT_WITH_CREATED_SQL = '''
+        INSERT INTO events (event_name, start_time, end_time, location, reminder_minutes,
+                            start_ts, end_ts, rrule, exdates, until_ts, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    '''
+    BULK_CHUNK_SIZE = 5000
+    # Khoảng nửa mở [ngày, ngày kế tiếp) trên epoch để dùng được idx_events_start_ts
+    # (date(start_time) = ... buộc quét toàn bảng)
+    SELECT_EVENTS_ON_DATE_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events 
+        WHERE start_ts >= ? AND start_ts < ?
+        ORDER BY start_ts, id
+    '''
+    SELECT_ALL_EVENTS_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events 
+        ORDER BY start_ts, id
+    '''
+    # Sự kiện giao với [start, end): bắt đầu trong khoảng (tìm theo idx_events_start_ts)
+    # hoặc bắt đầu trước đó nhưng chưa kết thúc (INDEXED BY để planner không quét
+    # toàn bộ lịch sử theo start_ts chỉ để tránh bước sắp xếp). Chuỗi lặp được lấy
+    # riêng qua idx_events_series: đã bắt đầu trước end và chưa hết (until_ts), các
+    # lần lặp trong khoảng do EventRow.occurrences sinh ra.
+    SELECT_EVENTS_BETWEEN_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events
+        WHERE start_ts >= :start AND start_ts < :end AND rrule IS NULL
+        UNION ALL
+        SELECT {EVENT_COLUMNS} FROM events INDEXED BY idx_events_end_ts
+        WHERE end_ts > :start AND start_ts < :start AND rrule IS NULL
+        UNION ALL
+        SELECT {EVENT_COLUMNS} FROM events INDEXED BY idx_events_series
+        WHERE rrule IS NOT NULL AND start_ts < :end AND (until_ts IS NULL OR until_ts > :start)
+        ORDER BY start_ts, id
+    '''
+    SELECT_EVENTS_FROM_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events WHERE start_ts >= :start AND rrule IS NULL
+        UNION ALL
+        SELECT {EVENT_COLUMNS} FROM events INDEXED BY idx_events_end_ts
+        WHERE end_ts > :start AND start_ts < :start AND rrule IS NULL
+        UNION ALL
+        SELECT {EVENT_COLUMNS} FROM events INDEXED BY idx_events_series
+        WHERE rrule IS NOT NULL AND (until_ts IS NULL OR until_ts > :start)
+        ORDER BY start_ts, id
+    '''
+    SELECT_EVENT_SQL = f'SELECT {EVENT_COLUMNS} FROM events WHERE id = ?'
+    SELECT_EVENTS_BY_IDS_SQL = f'SELECT {EVENT_COLUMNS} FROM events WHERE id IN ({{}})'
+    # Giới hạn số tham số mỗi câu (SQLite cũ cho tối đa 999)
+    IDS_CHUNK_SIZE = 500
+    # Phân trang theo khóa (start_ts, id): trang sau bắt đầu ngay sau dòng cuối của trang
+    # trước nhờ idx_events_start_ts (đã kèm rowid), không dùng OFFSET
+    SELECT_EVENTS_PAGE_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events
+        WHERE (start_ts, id) > (?, ?)
+        ORDER BY start_ts, id
+        LIMIT ?
+    '''
+    # Dòng không đọc được thời gian (start_ts NULL) đứng đầu như ORDER BY start_ts, id,
+    # được phân trang riêng theo id vì so sánh (start_ts, id) > (...) với NULL luôn sai
+    SELECT_EVENTS_PAGE_NULL_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events
+        WHERE start_ts IS NULL AND id > ?
+        ORDER BY id
+        LIMIT ?
+    '''
+    COUNT_EVENTS_SQL = 'SELECT COUNT(*) FROM events'
+    # Hàng đợi nhắc nhở: idx_events_pending_reminders chỉ chứa các nhắc chưa gửi
+    # của sự kiện đơn; chuỗi lặp nhớ lần lặp đã nhắc gần nhất ở series_fired_ts
+    SELECT_DUE_REMINDERS_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events
+        WHERE fired_ts IS NULL AND rrule IS NULL AND remind_ts <= ?
+        ORDER BY remind_ts
+        LIMIT ?
+    '''
+    NEXT_REMINDER_SQL = 'SELECT MIN(remind_ts) FROM events WHERE fired_ts IS NULL AND rrule IS NULL'
+    MARK_REMINDER_FIRED_SQL = 'UPDATE events SET fired_ts = ? WHERE id = ? AND fired_ts IS NULL'
+    SELECT_ACTIVE_SERIES_SQL = f'''
+        SELECT {EVENT_COLUMNS}, events.series_fired_ts FROM events INDEXED BY idx_events_series
+        WHERE rrule IS NOT NULL AND (until_ts IS NULL OR until_ts >= ?)
+    '''
+    MARK_OCCURRENCE_FIRED_SQL = '''
+        UPDATE events SET series_fired_ts = :start
+        WHERE id = :id AND (series_fired_ts IS NULL OR series_fired_ts < :start)
+    '''
+    PAGE_SIZE = 500
+    FIRST_PAGE_KEY = (None, 0)
+    MIN_START_TS = -2 ** 63
+    # start_ts/end_ts do trigger events_ts_update tính lại
+    UPDATE_EVENT_SQL = '''
+        UPDATE events 
+        SET event_name = ?, start_time = ?, end_time = ?, location = ?, reminder_minutes = ?
+        WHERE id = ?
+    '''
+    UPDATE_SERIES_SQL = 'UPDATE events SET rrule = ?, until_ts = ? WHERE id = ?'
+    SELECT_SERIES_SQL = 'SELECT rrule, exdates FROM events WHERE id = ?'
+    UPDATE_EXDATES_SQL = 'UPDATE events SET exdates = ? WHERE id = ?'
+    DELETE_EVENT_SQL = 'DELETE FROM events WHERE id = ?'
+    SEARCH_EVENTS_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events 
+        WHERE fold(event_name) LIKE ? OR fold(location) LIKE ?
+        ORDER BY start_ts, id
+    '''
+    SEARCH_EVENTS_FTS_SQL = f'''
+        SELECT {EVENT_COLUMNS} FROM events_fts
+        JOIN events ON events.id = events_fts.rowid
+        WHERE events_fts MATCH ?
+        ORDER BY bm25(events_fts), events.start_ts
+    '''
+    
+    # Epoch "giờ treo tường": chuỗi ISO không múi giờ được tính như UTC, chuỗi có múi
+    # giờ (+07:00, Z) được đổi sang UTC trước; khớp với calendar.timegm(utctimetuple())
+    # bên Python (xem to_epoch)
+    EPOCH_SQL = "CAST(strftime('%s', {0}) AS INTEGER)"
+    EPOCH_DATETIME = EventRow.EPOCH
+    
+    # Thời điểm nhắc (epoch); {0} là tiền tố cột ('' hoặc 'new.')
+    REMIND_TS_SQL = "{0}start_ts - 60 * coalesce({0}reminder_minutes, 0)"
+    # Cột sinh (GENERATED ALWAYS AS) cần SQLite >= 3.31, bản cũ hơn dùng cột thường + trigger
+    GENERATED_COLUMNS = sqlite3.sqlite_version_info >= (3, 31, 0)
+    
+    # Các bước nâng cấp schema theo PRAGMA user_version (bước i đưa lên phiên bản i + 1)
+    MIGRATIONS = (
+        'migrate_epoch_columns',
+        'migrate_change_counters',
+        'migrate_reminder_queue',
+        'migrate_recurrence',
+    )
+    # Các bảng được đếm số lần thay đổi (xem ChangeDetector)
+    TRACKED_TABLES = ('events',)
+    
+    # Chỉ mục FTS5 lưu tên/địa điểm đã bỏ "đ" (unicode61 không tách được dấu của đ),
+    # các dấu còn lại do remove_diacritics 2 bỏ khi tách từ => "hop" khớp "họp"
+    FTS_FOLD_SQL = "replace(replace(coalesce({0}, ''), 'đ', 'd'), 'Đ', 'D')"
+    FTS_SCHEMA = [
+        '''
+        CREATE VIRTUAL TABLE events_fts USING fts5(
+            event_name, location,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''',
+        '''
+        INSERT INTO events_fts(rowid, event_name, location)
+        SELECT id, {name}, {location} FROM events
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+            INSERT INTO events_fts(rowid, event_name, location)
+            VALUES (new.id, {new_name}, {new_location});
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+            DELETE FROM events_fts WHERE rowid = old.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF event_name, location ON events BEGIN
+            DELETE FROM events_fts WHERE rowid = old.id;
+            INSERT INTO events_fts(rowid, event_name, location)
+            VALUES (new.id, {new_name}, {new_location});
+        END
+        ''',
+    ]
+    FTS_TRIGGERS = ('events_fts_insert', 'events_fts_delete', 'events_fts_update')
+    SEARCH_TOKEN_RE = re.compile(r'\w+')
+    # Từ ngắn hơn mức này vẫn so khớp chuỗi con ("op" tìm ra "họp"), FTS chỉ khớp đầu từ
+    SEARCH_MIN_PREFIX = 3
     
     def __init__(self, db_path="schedule.db"):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        self.fts_enabled = False
         self.init_database()
     
+    def connection(self):
+        """Kết nối của thread hiện tại, mở và cấu hình ở lần gọi đầu tiên"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+        
+        # check_same_thread=False chỉ để close() đóng được kết nối của thread khác;
+        # mỗi kết nối vẫn chỉ được dùng bởi thread đã mở nó
+        conn = sqlite3.connect(self.db_path,
+                               timeout=self.BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False,
+                               cached_statements=self.STATEMENT_CACHE_SIZE)
+        conn.execute(f'PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}')
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')  # An toàn với WAL, bớt fsync mỗi commit
+        conn.create_function('fold', 1, self.fold_text, deterministic=True)
+        
+        with self._connections_lock:
+            self._connections.append(conn)
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+    
+    def close(self):
+        """Đóng mọi kết nối đã mở; lần gọi sau sẽ tự mở kết nối mới
+        
+        Đóng cả kết nối của thread khác nên chỉ gọi khi các thread đó đã ngừng
+        dùng DB (xem on_closing: chờ worker và ReminderSystem dừng trước).
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_name TEXT NOT NULL,
-                start_time TEXT NOT NULL,
-                end_time TEXT,
-                location TEXT,
-                reminder_minutes INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
+        conn = self.connection()
+        
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_name TEXT NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT,
+                    location TEXT,
+                    reminder_minutes INTEGER DEFAULT 0,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+        
+        self.migrate(conn)
+        self.fts_enabled = self.init_fts(conn)
+    
+    def migrate(self, conn):
+        """Nâng cấp schema tại chỗ, mỗi bước trong một transaction riêng"""
+        for target, step in enumerate(self.MIGRATIONS, 1):
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= target:
+                continue
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                # Kiểm tra lại sau khi giữ khóa ghi: tiến trình khác có thể vừa nâng cấp xong
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= target:
+                    continue
+                getattr(self, step)(conn)
+                conn.execute(f'PRAGMA user_version = {target}')
+    
+    def migrate_epoch_columns(self, conn):
+        """v1: thêm start_ts/end_ts (INTEGER, có index) tính từ chuỗi ISO"""
+        epoch = self.EPOCH_SQL.format
+        conn.execute('ALTER TABLE events ADD COLUMN start_ts INTEGER')
+        conn.execute('ALTER TABLE events ADD COLUMN end_ts INTEGER')
+        conn.execute(f'''
+            UPDATE events SET start_ts = {epoch('start_time')}, end_ts = {epoch('end_time')}
         ''')
         
-        conn.commit()
-        conn.close()
+        # Chuỗi SQLite không đọc được thì thử lại bằng datetime.fromisoformat
+        rows = conn.execute('''
+            SELECT id, start_time, end_time FROM events
+            WHERE start_ts IS NULL OR (end_ts IS NULL AND end_time IS NOT NULL)
+        ''').fetchall()
+        for event_id, start_time, end_time in rows:
+            try:
+                conn.execute('UPDATE events SET start_ts = ?, end_ts = ? WHERE id = ?',
+                             (self.to_epoch(start_time), self.to_epoch(end_time), event_id))
+            except (TypeError, ValueError):
+                print(f"Không đọc được thời gian của sự kiện #{event_id}: {start_time!r}")
+        
+        # Index trên chuỗi ISO (bản trước) không còn được truy vấn nào dùng
+        conn.execute('DROP INDEX IF EXISTS idx_events_start_time')
+        conn.execute('DROP INDEX IF EXISTS idx_events_end_time')
+        conn.execute('CREATE INDEX idx_events_start_ts ON events(start_ts)')
+        conn.execute('CREATE INDEX idx_events_end_ts ON events(end_ts)')
+        
+        # Ứng dụng tự điền epoch khi INSERT; trigger lo cho công cụ ghi trực tiếp và UPDATE
+        conn.execute(f'''
+            CREATE TRIGGER events_ts_insert AFTER INSERT ON events
+            WHEN new.start_ts IS NULL OR (new.end_ts IS NULL AND new.end_time IS NOT NULL)
+            BEGIN
+                UPDATE events SET start_ts = {epoch('new.start_time')}, end_ts = {epoch('new.end_time')}
+                WHERE id = new.id;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER events_ts_update AFTER UPDATE OF start_time, end_time ON events
+            BEGIN
+                UPDATE events SET start_ts = {epoch('new.start_time')}, end_ts = {epoch('new.end_time')}
+                WHERE id = new.id;
+            END
+        ''')
     
-    def add_event(self, event_data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO events (event_name, start_time, end_time, location, reminder_minutes)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            event_data["event"],
-            event_data["start_time"],
-            event_data["end_time"],
-            event_data["location"],
-            event_data["reminder_minutes"]
-        ))
-        
-        event_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return event_id
+    @staticmethod
+    def has_fts5():
+        """SQLite đang chạy có module FTS5 không (thử tạo bảng ảo trên DB trong bộ nhớ)"""
+        probe = sqlite3.connect(':memory:')
+        try:
+            probe.execute('CREATE VIRTUAL TABLE fts5_probe USING fts5(content)')
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            probe.close()
+        return True
     
-    def get_events(self, date_filter=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def init_fts(self, conn):
+        """Tạo bảng FTS5 + trigger đồng bộ; trả về False nếu SQLite không có FTS5
         
-        if date_filter:
-            cursor.execute('''
-                SELECT * FROM events 
-                WHERE date(start_time) = date(?)
-                ORDER BY start_time
-            ''', (date_filter,))
+        DB có thể đã được tạo bởi một bản SQLite có FTS5: khi đó trigger trỏ tới
+        events_fts sẽ làm mọi lệnh ghi vào events lỗi "no such module", nên phải
+        bỏ trigger (bảng ảo thì không xóa được khi thiếu module, để nguyên). Khi
+        FTS5 có lại, bảng cũ đã lệch dữ liệu nên được tạo lại từ đầu.
+        """
+        if not self.has_fts5():
+            with conn:
+                for trigger in self.FTS_TRIGGERS:
+                    conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            print("SQLite không có FTS5, tìm kiếm bằng LIKE")
+            return False
+        
+        names = {name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'events_fts' OR name LIKE 'events_fts_%'"
+        )}
+        if 'events_fts' in names and names.issuperset(self.FTS_TRIGGERS):
+            return True
+        
+        fold = self.FTS_FOLD_SQL.format
+        fields = dict(name=fold('event_name'), location=fold('location'),
+                      new_name=fold('new.event_name'), new_location=fold('new.location'))
+        try:
+            with conn:
+                if 'events_fts' in names:
+                    conn.execute('DROP TABLE events_fts')
+                for statement in self.FTS_SCHEMA:
+                    conn.execute(statement.format(**fields))
+        except sqlite3.OperationalError as e:
+            print(f"Không dùng được FTS5, tìm kiếm bằng LIKE: {e}")
+            return False
+        return True
+    
+    @staticmethod
+    def fold_text(text):
+        """Bỏ dấu tiếng Việt và viết thường, ví dụ "Họp Đầu Tuần" -> "hop dau tuan"."""
+        if text is None:
+            return None
+        decomposed = unicodedata.normalize('NFD', text.replace('đ', 'd').replace('Đ', 'D'))
+        return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+    
+    @staticmethod
+    def to_epoch(value):
+        """date/datetime/chuỗi ISO -> giây epoch theo giờ treo tường (None giữ nguyên)
+        
+        Cùng quy tắc với EPOCH_SQL (strftime('%s')): giá trị không múi giờ tính như
+        UTC, giá trị có múi giờ được đổi sang UTC (utctimetuple không đổi giá trị naive).
+        """
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        return calendar.timegm(value.utctimetuple())
+    
+    def _select_events(self, sql, params=()):
+        """Chạy SELECT {EVENT_COLUMNS} và trả về danh sách EventRow"""
+        cursor = self.connection().cursor()
+        cursor.row_factory = EventRow.from_cursor
+        return cursor.execute(sql, params).fetchall()
+    
+    def migrate_change_counters(self, conn):
+        """v2: bảng change_counters, tăng bởi trigger mỗi khi bảng được theo dõi thay đổi"""
+        conn.execute('''
+            CREATE TABLE change_counters (
+                table_name TEXT PRIMARY KEY,
+                counter INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        for table in self.TRACKED_TABLES:
+            conn.execute('INSERT INTO change_counters (table_name) VALUES (?)', (table,))
+            for action in ('INSERT', 'UPDATE', 'DELETE'):
+                conn.execute(f'''
+                    CREATE TRIGGER {table}_count_{action.lower()} AFTER {action} ON {table}
+                    BEGIN
+                        UPDATE change_counters SET counter = counter + 1 WHERE table_name = '{table}';
+                    END
+                ''')
+    
+    def migrate_reminder_queue(self, conn):
+        """v3: remind_ts (tính từ start_ts và reminder_minutes) + fired_ts, index các nhắc chưa gửi"""
+        if self.GENERATED_COLUMNS:
+            conn.execute(f'''
+                ALTER TABLE events ADD COLUMN remind_ts INTEGER
+                GENERATED ALWAYS AS ({self.REMIND_TS_SQL.format('')}) VIRTUAL
+            ''')
         else:
-            cursor.execute('''
-                SELECT * FROM events 
-                ORDER BY start_time
+            # SQLite cũ: cột thường, được trigger tính lại mỗi khi start_ts/reminder_minutes đổi
+            conn.execute('ALTER TABLE events ADD COLUMN remind_ts INTEGER')
+            conn.execute(f'UPDATE events SET remind_ts = {self.REMIND_TS_SQL.format("")}')
+            conn.execute(f'''
+                CREATE TRIGGER events_remind_ts_insert AFTER INSERT ON events
+                BEGIN
+                    UPDATE events SET remind_ts = {self.REMIND_TS_SQL.format('new.')} WHERE id = new.id;
+                END
+            ''')
+            conn.execute(f'''
+                CREATE TRIGGER events_remind_ts_update AFTER UPDATE OF start_ts, reminder_minutes ON events
+                BEGIN
+                    UPDATE events SET remind_ts = {self.REMIND_TS_SQL.format('new.')} WHERE id = new.id;
+                END
             ''')
+        conn.execute('ALTER TABLE events ADD COLUMN fired_ts INTEGER')
+        # Sự kiện đã bắt đầu trước khi nâng cấp coi như đã nhắc, tránh gửi bù hàng loạt
+        conn.execute('UPDATE events SET fired_ts = remind_ts WHERE start_ts < ?',
+                     (self.to_epoch(datetime.now()),))
+        conn.execute('CREATE INDEX idx_events_pending_reminders ON events(remind_ts) WHERE fired_ts IS NULL')
+        
+        # Đổi giờ hoặc số phút nhắc thì nhắc lại theo thời điểm mới
+        conn.execute('''
+            CREATE TRIGGER events_reminder_reset AFTER UPDATE OF start_time, reminder_minutes ON events
+            WHEN old.start_time IS NOT new.start_time OR old.reminder_minutes IS NOT new.reminder_minutes
+            BEGIN
+                UPDATE events SET fired_ts = NULL WHERE id = new.id;
+            END
+        ''')
+        # Đánh dấu đã nhắc (fired_ts) không phải thay đổi mà giao diện cần nạp lại
+        conn.execute('DROP TRIGGER IF EXISTS events_count_update')
+        conn.execute('''
+            CREATE TRIGGER events_count_update
+            AFTER UPDATE OF event_name, start_time, end_time, location, reminder_minutes ON events
+            BEGIN
+                UPDATE change_counters SET counter = counter + 1 WHERE table_name = 'events';
+            END
+        ''')
+    
+    def migrate_recurrence(self, conn):
+        """v4: sự kiện lặp lại (rrule, exdates, until_ts) và lần lặp đã nhắc (series_fired_ts)"""
+        conn.execute('ALTER TABLE events ADD COLUMN rrule TEXT')
+        conn.execute('ALTER TABLE events ADD COLUMN exdates TEXT')
+        conn.execute('ALTER TABLE events ADD COLUMN until_ts INTEGER')  # Hết lần lặp cuối, NULL = vô hạn
+        conn.execute('ALTER TABLE events ADD COLUMN series_fired_ts INTEGER')
+        conn.execute('CREATE INDEX idx_events_series ON events(start_ts) WHERE rrule IS NOT NULL')
+        
+        # Chuỗi lặp không đi qua hàng đợi remind_ts (chỉ có một remind_ts cho cả chuỗi)
+        conn.execute('DROP INDEX IF EXISTS idx_events_pending_reminders')
+        conn.execute('''
+            CREATE INDEX idx_events_pending_reminders ON events(remind_ts)
+            WHERE fired_ts IS NULL AND rrule IS NULL
+        ''')
+        conn.execute('DROP TRIGGER IF EXISTS events_reminder_reset')
+        conn.execute('''
+            CREATE TRIGGER events_reminder_reset AFTER UPDATE OF start_time, reminder_minutes ON events
+            WHEN old.start_time IS NOT new.start_time OR old.reminder_minutes IS NOT new.reminder_minutes
+            BEGIN
+                UPDATE events SET fired_ts = NULL, series_fired_ts = NULL WHERE id = new.id;
+            END
+        ''')
+        conn.execute('DROP TRIGGER IF EXISTS events_count_update')
+        conn.execute('''
+            CREATE TRIGGER events_count_update
+            AFTER UPDATE OF event_name, start_time, end_time, location, reminder_minutes,
+                            rrule, exdates ON events
+            BEGIN
+                UPDATE change_counters SET counter = counter + 1 WHERE table_name = 'events';
+            END
+        ''')
+    
+    @classmethod
+    def series_until_ts(cls, start_time, end_time, rrule):
+        """Epoch lúc kết thúc lần lặp cuối của chuỗi (None nếu vô hạn hoặc không lặp)"""
+        if not rrule:
+            return None
+        start = datetime.fromisoformat(start_time) if isinstance(start_time, str) else start_time
+        last_start = RecurrenceRule.parse(rrule).last_start(start)
+        if last_start is None:
+            return None
+        if end_time:
+            end = datetime.fromisoformat(end_time) if isinstance(end_time, str) else end_time
+            last_start += end - start
+        return cls.to_epoch(last_start)
+    
+    def add_event(self, event_data):
+        conn = self.connection()
+        
+        rrule = event_data.get("recurrence")
+        
+        with conn:
+            cursor = conn.execute(self.INSERT_EVENT_SQL, (
+                event_data["event"],
+                event_data["start_time"],
+                event_data["end_time"],
+                event_data["location"],
+                event_data["reminder_minutes"],
+                self.to_epoch(event_data["start_time"]),
+                self.to_epoch(event_data["end_time"]),
+                rrule,
+                event_data.get("exdates"),
+                self.series_until_ts(event_data["start_time"], event_data["end_time"], rrule)
+            ))
+        
+        return cursor.lastrowid
+    
+    def add_events_many(self, events, chunk_size=None):
+        """Thêm nhiều sự kiện trong một transaction, trả về danh sách id theo thứ tự
+        
+        events là iterable các dict như add_event (có thể thêm "created_at",
+        "recurrence", "exdates"), được đọc dần theo từng khối chunk_size dòng
+        rồi đưa vào executemany. Lỗi ở bất kỳ dòng nào sẽ rollback toàn bộ.
+        """
+        conn = self.connection()
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        to_epoch = self.to_epoch
+        until_ts = self.series_until_ts
+        rows = (
+            (event_data["event"],
+             event_data["start_time"],
+             event_data.get("end_time"),
+             event_data.get("location"),
+             event_data.get("reminder_minutes") or 0,
+             to_epoch(event_data["start_time"]),
+             to_epoch(event_data.get("end_time")),
+             event_data.get("recurrence"),
+             event_data.get("exdates"),
+             until_ts(event_data["start_time"], event_data.get("end_time"), event_data.get("recurrence")),
+             event_data.get("created_at"))
+            for event_data in events
+        )
+        
+        event_ids = []
+        with conn:
+            # Giữ khóa ghi từ đầu để id AUTOINCREMENT của mỗi khối liên tiếp nhau
+            conn.execute('BEGIN IMMEDIATE')
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                conn.executemany(self.INSERT_EVENT_WITH_CREATED_SQL, chunk)
+                last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+                event_ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
+        
+        return event_ids
+    
+    def get_events(self, date_filter=None):
+        if date_filter:
+            day_range = self.day_range(date_filter)
+            if day_range is None:
+                return []
+            return self._select_events(self.SELECT_EVENTS_ON_DATE_SQL, day_range)
+        
+        return self._select_events(self.SELECT_ALL_EVENTS_SQL)
+    
+    def count_events(self):
+        return self.connection().execute(self.COUNT_EVENTS_SQL).fetchone()[0]
+    
+    def get_events_page(self, after=None, limit=None):
+        """Một trang sự kiện sắp theo (start_ts, id), ngay sau khóa after
+        
+        after là None (trang đầu), cặp (start_ts, id) hoặc EventRow cuối của
+        trang trước. Thứ tự giống get_events()/stream_events(): các dòng không
+        có start_ts (thời gian không đọc được) đứng đầu, theo id.
+        """
+        if after is None:
+            after = self.FIRST_PAGE_KEY
+        elif isinstance(after, EventRow):
+            after = (after.start_ts, after.id)
+        limit = limit or self.PAGE_SIZE
+        
+        page = []
+        if after[0] is None:
+            page = self._select_events(self.SELECT_EVENTS_PAGE_NULL_SQL, (after[1], limit))
+            if len(page) == limit:
+                return page
+            after = (self.MIN_START_TS, 0)
+        
+        return page + self._select_events(self.SELECT_EVENTS_PAGE_SQL,
+                                          (after[0], after[1], limit - len(page)))
+    
+    def iter_events(self, page_size=None):
+        """Duyệt toàn bộ sự kiện theo từng trang; giữa hai trang không giữ transaction đọc"""
+        after = None
+        while True:
+            page = self.get_events_page(after, page_size)
+            yield from page
+            if len(page) < (page_size or self.PAGE_SIZE):
+                return
+            after = page[-1]
+    
+    def stream_events(self, batch_size=None):
+        """Duyệt toàn bộ sự kiện trên một cursor, lấy dần batch_size dòng mỗi lần
+        
+        Nhanh hơn iter_events nhưng giữ một snapshot đọc (WAL) cho đến khi duyệt
+        xong, nên chỉ dùng cho các lượt đọc liền mạch như xuất file.
+        """
+        cursor = self.connection().cursor()
+        cursor.row_factory = EventRow.from_cursor
+        cursor.execute(self.SELECT_ALL_EVENTS_SQL)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size or self.PAGE_SIZE)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+    
+    def get_due_reminders(self, now_ts, limit):
+        """Các sự kiện có nhắc chưa gửi và đã đến hạn tại now_ts (epoch), sớm nhất trước"""
+        return self._select_events(self.SELECT_DUE_REMINDERS_SQL, (now_ts, limit))
+    
+    def next_reminder_ts(self):
+        """Epoch của nhắc nhở chưa gửi sớm nhất (None nếu không còn)"""
+        return self.connection().execute(self.NEXT_REMINDER_SQL).fetchone()[0]
+    
+    def get_active_series(self, since_ts):
+        """Các chuỗi lặp còn lần lặp kết thúc sau since_ts, kèm series_fired_ts của mỗi chuỗi"""
+        rows = self.connection().execute(self.SELECT_ACTIVE_SERIES_SQL, (since_ts,)).fetchall()
+        return [(EventRow.from_cursor(None, row), row[-1]) for row in rows]
+    
+    def mark_occurrence_fired(self, event_id, start_ts):
+        """Đánh dấu đã nhắc lần lặp bắt đầu lúc start_ts; False nếu lần này (hoặc lần sau) đã được nhắc"""
+        conn = self.connection()
+        with conn:
+            cursor = conn.execute(self.MARK_OCCURRENCE_FIRED_SQL, {"id": event_id, "start": start_ts})
+        return cursor.rowcount > 0
+    
+    def mark_reminders_fired(self, event_ids, fired_ts):
+        """Đánh dấu đã nhắc, trả về các id thực sự được đánh dấu bởi lần gọi này
+        
+        Chỉ dòng còn fired_ts IS NULL mới được cập nhật nên hai thread/tiến trình
+        cùng nhắc một sự kiện thì chỉ một bên nhận được id.
+        """
+        conn = self.connection()
+        claimed = []
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for event_id in event_ids:
+                if conn.execute(self.MARK_REMINDER_FIRED_SQL, (fired_ts, event_id)).rowcount:
+                    claimed.append(event_id)
+        return claimed
+    
+    def get_event(self, event_id):
+        """Tra một sự kiện theo khóa chính, trả về EventRow hoặc None"""
+        rows = self._select_events(self.SELECT_EVENT_SQL, (event_id,))
+        return rows[0] if rows else None
+    
+    def get_events_by_ids(self, event_ids):
+        """Tra nhiều sự kiện theo id, trả về danh sách EventRow theo thứ tự của event_ids
         
-        events = cursor.fetchall()
-        conn.close()
-        return events
+        Truy vấn IN (...) theo từng nhóm IDS_CHUNK_SIZE id; id lặp lại chỉ lấy một
+        lần, id không tồn tại bị bỏ qua.
+        """
+        event_ids = list(dict.fromkeys(int(event_id) for event_id in event_ids))
+        events = {}
+        
+        for offset in range(0, len(event_ids), self.IDS_CHUNK_SIZE):
+            chunk = event_ids[offset:offset + self.IDS_CHUNK_SIZE]
+            sql = self.SELECT_EVENTS_BY_IDS_SQL.format(', '.join('?' * len(chunk)))
+            for event in self._select_events(sql, chunk):
+                events[event.id] = event
+        
+        return [events[event_id] for event_id in event_ids if event_id in events]
+    
+    def get_events_between(self, start, end=None):
+        """Các sự kiện giao với khoảng [start, end), sắp theo start_time
+        
+        start/end là date, datetime hoặc chuỗi ISO; end=None nghĩa là không giới hạn.
+        Sự kiện không có end_time được coi là một thời điểm tại start_time.
+        """
+        params = {"start": self.to_epoch(start)}
+        
+        if end is None:
+            return self._select_events(self.SELECT_EVENTS_FROM_SQL, params)
+        
+        params["end"] = self.to_epoch(end)
+        return self._select_events(self.SELECT_EVENTS_BETWEEN_SQL, params)
+    
+    def get_occurrences_between(self, start, end=None):
+        """Các lần diễn ra giao với [start, end): sự kiện đơn và các lần lặp của chuỗi
+        
+        Trả về iterator sắp theo thời gian bắt đầu; các lần lặp chỉ được sinh khi
+        duyệt tới (trộn bằng heapq.merge), nên end=None vẫn dùng được nếu người
+        gọi tự dừng.
+        """
+        window_start = self.EPOCH_DATETIME + timedelta(seconds=self.to_epoch(start))
+        window_end = None if end is None else self.EPOCH_DATETIME + timedelta(seconds=self.to_epoch(end))
+        
+        single_events = []
+        series = []
+        for event in self.get_events_between(start, end):
+            if event.recurrence is None:
+                single_events.append(event)
+            else:
+                series.append(event.occurrences(window_start, window_end))
+        
+        return heapq.merge(single_events, *series, key=lambda event: (event.start, event.id))
+    
+    @classmethod
+    def day_range(cls, date_filter):
+        """Chuyển ngày (date/datetime hoặc chuỗi ISO) thành cặp epoch [ngày, ngày kế tiếp)
+        
+        Trả về None nếu không đọc được ngày, giống date(?) trả về NULL.
+        """
+        try:
+            day = datetime.fromisoformat(str(date_filter)[:10]).date()
+        except ValueError:
+            return None
+        return cls.to_epoch(day), cls.to_epoch(day + timedelta(days=1))
     
     def update_event(self, event_id, event_data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE events 
-            SET event_name = ?, start_time = ?, end_time = ?, location = ?, reminder_minutes = ?
-            WHERE id = ?
-        ''', (
-            event_data["event"],
-            event_data["start_time"],
-            event_data["end_time"],
-            event_data["location"],
-            event_data["reminder_minutes"],
-            event_id
-        ))
-        
-        conn.commit()
-        conn.close()
+        """Sửa sự kiện; chuỗi lặp giữ quy tắc cũ trừ khi event_data có "recurrence"
+        
+        Lần sửa áp dụng cho cả chuỗi: start_time/end_time là lần đầu của chuỗi.
+        """
+        conn = self.connection()
+        
+        with conn:
+            conn.execute(self.UPDATE_EVENT_SQL, (
+                event_data["event"],
+                event_data["start_time"],
+                event_data["end_time"],
+                event_data["location"],
+                event_data["reminder_minutes"],
+                event_id
+            ))
+            
+            if "recurrence" in event_data:
+                rrule = event_data["recurrence"]
+            else:
+                row = conn.execute(self.SELECT_SERIES_SQL, (event_id,)).fetchone()
+                rrule = row[0] if row else None
+            if rrule or "recurrence" in event_data:
+                until_ts = self.series_until_ts(event_data["start_time"], event_data["end_time"], rrule)
+                conn.execute(self.UPDATE_SERIES_SQL, (rrule, until_ts, event_id))
+    
+    def add_exception(self, event_id, occurrence_start):
+        """Hủy một lần lặp của chuỗi (thêm vào exdates), các lần khác giữ nguyên"""
+        conn = self.connection()
+        if isinstance(occurrence_start, str):
+            occurrence_start = datetime.fromisoformat(occurrence_start)
+        
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(self.SELECT_SERIES_SQL, (event_id,)).fetchone()
+            if row is None or not row[0]:
+                return False
+            exdates = [value for value in (row[1] or '').split(',') if value]
+            if occurrence_start.isoformat() not in exdates:
+                exdates.append(occurrence_start.isoformat())
+                conn.execute(self.UPDATE_EXDATES_SQL, (','.join(exdates), event_id))
+        return True
     
     def delete_event(self, event_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM events WHERE id = ?', (event_id,))
-        conn.commit()
-        conn.close()
+        conn = self.connection()
+        with conn:
+            conn.execute(self.DELETE_EVENT_SQL, (event_id,))
     
     def search_events(self, keyword):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM events 
-            WHERE event_name LIKE ? OR location LIKE ?
-            ORDER BY start_time
-        ''', (f'%{keyword}%', f'%{keyword}%'))
-        
-        events = cursor.fetchall()
-        conn.close()
-        return events
+        """Tìm theo tên/địa điểm, không phân biệt dấu
+        
+        Có FTS5: mỗi từ khớp theo tiền tố, kết quả xếp theo bm25. Không có FTS5,
+        từ khóa không có chữ/số hoặc có từ ngắn hơn SEARCH_MIN_PREFIX: so khớp
+        chuỗi con trên dạng đã bỏ dấu.
+        """
+        folded = self.fold_text(keyword)
+        tokens = self.SEARCH_TOKEN_RE.findall(folded)
+        
+        if self.fts_enabled and tokens and min(map(len, tokens)) >= self.SEARCH_MIN_PREFIX:
+            query = ' '.join(f'"{token}"*' for token in tokens)
+            return self._select_events(self.SEARCH_EVENTS_FTS_SQL, (query,))
+        
+        pattern = f'%{folded}%'
+        return self._select_events(self.SEARCH_EVENTS_SQL, (pattern, pattern))
+
+class ChangeDetector:
+    """Phát hiện thay đổi từ kết nối hoặc tiến trình khác với chi phí rất thấp
+    
+    PRAGMA data_version chỉ đổi khi một kết nối khác commit nên có thể gọi liên
+    tục; chỉ khi nó đổi mới đọc change_counters để biết bảng nào thực sự thay
+    đổi. Ghi qua chính kết nối của thread đang poll không làm data_version đổi,
+    các thay đổi đó được nhận ra ở lần data_version đổi kế tiếp.
+    """
+    
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._data_version = None
+        self._counters = {}
+        self.poll()
+    
+    def poll(self):
+        """Trả về tập tên bảng đã thay đổi kể từ lần poll trước (rỗng nếu không có gì)"""
+        conn = self.db_manager.connection()
+        data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if data_version == self._data_version:
+            return set()
+        self._data_version = data_version
+        
+        counters = dict(conn.execute('SELECT table_name, counter FROM change_counters'))
+        changed = {table for table, counter in counters.items()
+                   if self._counters.get(table) != counter}
+        self._counters = counters
+        return changed
+    
+    def acknowledge(self):
+        """Coi mọi thay đổi đã commit tới lúc này là đã xử lý
+        
+        Gọi ngay sau khi chính ứng dụng ghi DB (kể cả qua thread worker, vốn làm
+        data_version đổi) và ngay trước khi tự nạp lại giao diện, để lần poll sau
+        không nạp lại lần nữa. Thay đổi từ nơi khác commit sau đó vẫn được báo.
+        """
+        self.poll()
 
 class ICSExporter:
     """Xuất sự kiện ra file iCalendar (.ics)"""
@@ -591,22 +1997,35 @@ class ICSExporter:
     @staticmethod
     def generate_ics_content(events):
         """Tạo nội dung file .ics từ danh sách sự kiện"""
+        return "\r\n".join(ICSExporter.iter_ics_lines(events))
+    
+    @staticmethod
+    def iter_ics_lines(events):
+        """Sinh lần lượt các dòng của file .ics, mỗi lần chỉ giữ một sự kiện trong bộ nhớ"""
         
         # Header của file .ics
-        ics_content = [
+        yield from (
             "BEGIN:VCALENDAR",
             "VERSION:2.0",
             "PRODID:-//Personal Schedule Assistant//VN",
             "CALSCALE:GREGORIAN",
             "METHOD:PUBLISH",
-        ]
+        )
         
         # Thêm từng sự kiện
         for event in events:
             event_id, event_name, start_time_str, end_time_str, location, reminder_minutes, created_at = event
+            ics_content = []
+            
+            # Sự kiện có thời gian không đọc được thì không xuất được sang .ics
+            try:
+                start_time = event.start
+                end_time = event.end if end_time_str else None
+            except ValueError:
+                print(f"Bỏ qua sự kiện #{event_id} khi xuất .ics: thời gian không đọc được ({start_time_str!r})")
+                continue
             
             # Format thời gian theo chuẩn iCalendar
-            start_time = datetime.fromisoformat(start_time_str)
             dtstart = start_time.strftime("%Y%m%dT%H%M%S")
             
             # Tạo UID duy nhất cho sự kiện
@@ -621,11 +2040,17 @@ class ICSExporter:
             ])
             
             # Thời gian kết thúc (nếu có)
-            if end_time_str:
-                end_time = datetime.fromisoformat(end_time_str)
+            if end_time:
                 dtend = end_time.strftime("%Y%m%dT%H%M%S")
                 ics_content.append(f"DTEND:{dtend}")
             
+            # Chuỗi lặp: xuất quy tắc và các lần bị hủy, không trải từng lần lặp ra file
+            if event.rrule:
+                ics_content.append(f"RRULE:{event.rrule}")
+                if event.excluded_starts:
+                    exdates = ",".join(sorted(start.strftime("%Y%m%dT%H%M%S") for start in event.excluded_starts))
+                    ics_content.append(f"EXDATE:{exdates}")
+            
             # Tên sự kiện
             ics_content.append(f"SUMMARY:{event_name}")
             
@@ -659,22 +2084,128 @@ class ICSExporter:
             
             # Kết thúc sự kiện
             ics_content.append("END:VEVENT")
+            yield from ics_content
         
         # Footer của file .ics
-        ics_content.append("END:VCALENDAR")
-        
-        return "\r\n".join(ics_content)
+        yield "END:VCALENDAR"
     
     @staticmethod
     def save_ics_file(events, filename):
-        """Lưu sự kiện ra file .ics"""
-        ics_content = ICSExporter.generate_ics_content(events)
+        """Lưu sự kiện ra file .ics (events có thể là generator, ghi dần từng dòng)
+        
+        Trả về số sự kiện thực sự được ghi.
+        """
+        lines = ICSExporter.iter_ics_lines(events)
+        count = 0
         
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write(ics_content)
+            f.write(next(lines))
+            for line in lines:
+                f.write("\r\n")
+                f.write(line)
+                count += line == "BEGIN:VEVENT"
         
-        return filename
+        return count
+    
+class ICSImporter:
+    """Đọc sự kiện từ file iCalendar (.ics)"""
+    
+    # TRIGGER của VALARM, ví dụ -PT15M, -PT1H30M, -P1D
+    DURATION_RE = re.compile(r'^([+-]?)P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+    
+    @staticmethod
+    def unfold_lines(lines):
+        """Ghép các dòng bị gấp (dòng bắt đầu bằng khoảng trắng là phần tiếp theo)"""
+        current = None
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if line[:1] in (' ', '\t') and current is not None:
+                current += line[1:]
+                continue
+            if current is not None:
+                yield current
+            current = line
+        if current is not None:
+            yield current
+    
+    ESCAPE_RE = re.compile(r'\\(.)')
+    
+    @staticmethod
+    def unescape(value):
+        """Bỏ escape của TEXT: \\n -> xuống dòng, \\, \\; \\\\ -> ký tự gốc"""
+        return ICSImporter.ESCAPE_RE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+    
+    @staticmethod
+    def parse_datetime(value):
+        """DTSTART/DTEND -> datetime giờ địa phương (không tz)"""
+        if len(value) == 8:  # Sự kiện cả ngày: YYYYMMDD
+            return datetime.strptime(value, "%Y%m%d")
+        if value.endswith('Z'):
+            utc_time = datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+            return utc_time.astimezone().replace(tzinfo=None)
+        return datetime.strptime(value, "%Y%m%dT%H%M%S")
     
+    @staticmethod
+    def parse_trigger_minutes(value):
+        """Số phút nhắc trước từ TRIGGER (0 nếu không đọc được hoặc nhắc sau giờ bắt đầu)"""
+        match = ICSImporter.DURATION_RE.match(value.strip())
+        if not match or match.group(1) != '-':
+            return 0
+        weeks, days, hours, minutes, seconds = (int(part or 0) for part in match.groups()[1:])
+        return ((weeks * 7 + days) * 24 + hours) * 60 + minutes + seconds // 60
+    
+    @staticmethod
+    def iter_events(lines):
+        """Sinh lần lượt các dict sự kiện (cùng dạng kết quả NLP) từ các dòng của file .ics"""
+        event = None
+        in_alarm = False
+        
+        for line in ICSImporter.unfold_lines(lines):
+            name, _, value = line.partition(':')
+            name = name.split(';', 1)[0].upper()
+            
+            if name == 'BEGIN' and value == 'VEVENT':
+                event = {"event": "", "start_time": None, "end_time": None,
+                         "location": "", "reminder_minutes": 0,
+                         "recurrence": None, "exdates": None}
+            elif event is None:
+                continue
+            elif name == 'BEGIN' and value == 'VALARM':
+                in_alarm = True
+            elif name == 'END' and value == 'VALARM':
+                in_alarm = False
+            elif in_alarm:
+                if name == 'TRIGGER' and not event["reminder_minutes"]:
+                    event["reminder_minutes"] = ICSImporter.parse_trigger_minutes(value)
+            elif name == 'END' and value == 'VEVENT':
+                if event["start_time"]:
+                    yield event
+                event = None
+            elif name == 'DTSTART':
+                event["start_time"] = ICSImporter.parse_datetime(value).isoformat()
+            elif name == 'DTEND':
+                event["end_time"] = ICSImporter.parse_datetime(value).isoformat()
+            elif name == 'SUMMARY':
+                event["event"] = ICSImporter.unescape(value)
+            elif name == 'LOCATION':
+                event["location"] = ICSImporter.unescape(value)
+            elif name == 'RRULE':
+                try:
+                    event["recurrence"] = str(RecurrenceRule.parse(value))
+                except ValueError as e:
+                    print(f"Bỏ qua RRULE không hỗ trợ ({value}): {e}")
+            elif name == 'EXDATE':
+                exdates = [ICSImporter.parse_datetime(part).isoformat() for part in value.split(',') if part]
+                if event["exdates"]:
+                    exdates.insert(0, event["exdates"])
+                event["exdates"] = ",".join(exdates)
+    
+    @staticmethod
+    def read_ics_file(filename):
+        """Đọc dần file .ics, sinh các dict sự kiện"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            yield from ICSImporter.iter_events(f)
+
 class ExportFormatDialog:
     """Hộp thoại chọn định dạng xuất với màu sắc đồng bộ"""
     
@@ -896,13 +2427,38 @@ class ExportFormatDialog:
         self.dialog.destroy()
 
 class ReminderSystem:
-    """Hệ thống nhắc nhở"""
+    """Hệ thống nhắc nhở
+    
+    Hàng đợi nhắc nhở nằm trong DB: remind_ts/fired_ts với index một phần trên
+    các nhắc chưa gửi. Thread nền chỉ đọc các dòng đã đến hạn (ORDER BY remind_ts
+    LIMIT theo index) rồi chờ trên Condition đến thời điểm nhắc kế tiếp;
+    wake() đánh thức nó ngay khi sự kiện được thêm, sửa, xóa.
+    Mỗi nhắc được đánh dấu fired_ts trước khi gửi nên khởi động lại không gửi
+    trùng; nhắc bị lỡ khi ứng dụng tắt được gửi bù lúc khởi động nếu sự kiện
+    chưa bắt đầu.
+    
+    Chuỗi lặp không nằm trong hàng đợi remind_ts: mỗi chuỗi chỉ giữ trong bộ nhớ
+    lần lặp kế tiếp cần nhắc (nạp lại khi bị đánh thức), lần đã nhắc được ghi
+    vào series_fired_ts theo cùng cách đánh dấu trước khi gửi.
+    """
+    
+    # Chờ tối đa bấy nhiêu giây mỗi lượt để tự chỉnh khi đồng hồ hệ thống bị đổi/ngủ máy
+    MAX_WAIT_SECONDS = 60
+    DUE_BATCH_SIZE = 100
+    # Nhắc của sự kiện đã bắt đầu quá bấy nhiêu giây thì chỉ đánh dấu, không gửi
+    START_GRACE_SECONDS = 60
     
-    def __init__(self, db_manager, gui_callback):
+    def __init__(self, db_manager, gui_callback, clock=datetime.now):
         self.db_manager = db_manager
         self.gui_callback = gui_callback
+        self.clock = clock
         self.is_running = False
         self.thread = None
+        self._condition = threading.Condition()
+        self._wakeup = False
+        # Chuỗi lặp: id -> (thời điểm nhắc, EventRow của lần lặp kế tiếp, EventRow của chuỗi)
+        self._series = {}
+        self._series_dirty = True
     
     def start(self):
         self.is_running = True
@@ -910,25 +2466,288 @@ class ReminderSystem:
         self.thread.start()
     
     def stop(self):
-        self.is_running = False
+        """Dừng thread nhắc nhở và chờ nó thoát hẳn (kể cả lượt run_pending đang chạy)"""
+        with self._condition:
+            self.is_running = False
+            self._condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+    
+    def wake(self):
+        """Yêu cầu thread tính lại thời điểm nhắc kế tiếp ngay
+        
+        Hàng đợi nằm trong DB nên sau khi thêm, sửa, xóa hay nhập sự kiện chỉ
+        cần gọi hàm này (chuỗi lặp cũng được nạp lại).
+        """
+        with self._condition:
+            self._wakeup = True
+            self._series_dirty = True
+            self._condition.notify_all()
+    
+    def next_due(self):
+        """Thời điểm nhắc chưa gửi gần nhất (None nếu không còn)"""
+        remind_ts = self.db_manager.next_reminder_ts()
+        candidates = [entry[0] for entry in self._series.values()]
+        if remind_ts is not None:
+            candidates.append(EventRow.EPOCH + timedelta(seconds=remind_ts))
+        return min(candidates, default=None)
+    
+    @staticmethod
+    def format_message(event):
+        return f"Sắp diễn ra: {event.name}\nThời gian: {event.start.strftime('%H:%M %d/%m/%Y')}\nĐịa điểm: {event.location}"
+    
+    def load_series(self, now):
+        """Nạp lại lần lặp kế tiếp cần nhắc của mọi chuỗi còn hiệu lực"""
+        self._series_dirty = False
+        since_ts = self.db_manager.to_epoch(now) - self.START_GRACE_SECONDS
+        self._series = {}
+        for event, fired_ts in self.db_manager.get_active_series(since_ts):
+            self._queue_occurrence(event, fired_ts, now)
+    
+    def _queue_occurrence(self, event, fired_ts, now):
+        """Xếp lần lặp đầu tiên sau lần đã nhắc (fired_ts) và chưa bắt đầu quá START_GRACE_SECONDS"""
+        self._series.pop(event.id, None)
+        rule = event.recurrence
+        if rule is None:
+            return
+        
+        window_start = now - timedelta(seconds=self.START_GRACE_SECONDS)
+        if fired_ts is not None:
+            window_start = max(window_start, EventRow.EPOCH + timedelta(seconds=fired_ts + 1))
+        start = next(rule.occurrences(event.start, window_start, None, event.excluded_starts), None)
+        if start is not None:
+            remind_at = start - timedelta(minutes=event.reminder_minutes or 0)
+            self._series[event.id] = (remind_at, event.occurrence_at(start), event)
+    
+    def run_series(self, now):
+        """Gửi nhắc của các lần lặp đã đến hạn, trả về danh sách thông báo đã gửi"""
+        if self._series_dirty:
+            self.load_series(now)
+        
+        now_ts = self.db_manager.to_epoch(now)
+        messages = []
+        for remind_at, occurrence, series in [entry for entry in self._series.values() if entry[0] <= now]:
+            while remind_at <= now:
+                # Thread/tiến trình khác có thể đã nhắc lần lặp này
+                if (self.db_manager.mark_occurrence_fired(occurrence.id, occurrence.start_ts)
+                        and occurrence.start_ts >= now_ts - self.START_GRACE_SECONDS):
+                    message = self.format_message(occurrence)
+                    self.gui_callback(message)
+                    messages.append(message)
+                
+                self._queue_occurrence(series, occurrence.start_ts, now)
+                entry = self._series.get(series.id)
+                if entry is None:
+                    break
+                remind_at, occurrence, series = entry
+        
+        return messages
+    
+    def run_pending(self, now=None):
+        """Gửi mọi nhắc nhở đến hạn tại thời điểm now, trả về danh sách thông báo đã gửi"""
+        now = now or self.clock()
+        now_ts = self.db_manager.to_epoch(now)
+        messages = []
+        
+        while True:
+            due = self.db_manager.get_due_reminders(now_ts, self.DUE_BATCH_SIZE)
+            if not due:
+                break
+            
+            claimed = set(self.db_manager.mark_reminders_fired([event.id for event in due], now_ts))
+            for event in due:
+                if event.id not in claimed:
+                    continue  # Thread/tiến trình khác đã nhắc
+                if event.start_ts < now_ts - self.START_GRACE_SECONDS:
+                    continue  # Sự kiện đã qua lúc ứng dụng tắt
+                
+                message = self.format_message(event)
+                self.gui_callback(message)
+                messages.append(message)
+            
+            if len(due) < self.DUE_BATCH_SIZE:
+                break
+        
+        messages.extend(self.run_series(now))
+        return messages
     
     def _check_reminders(self):
+        # Lượt đầu tiên gửi bù các nhắc bị lỡ khi ứng dụng tắt
         while self.is_running:
+            timeout = self.MAX_WAIT_SECONDS
             try:
-                events = self.db_manager.get_events()
-                current_time = datetime.now()
-                
-                for event in events:
-                    event_id, event_name, start_time_str, end_time, location, reminder_minutes, created_at = event
-                    start_time = datetime.fromisoformat(start_time_str)
-                    
-                    reminder_time = start_time - timedelta(minutes=reminder_minutes)
-                    
-                    if current_time >= reminder_time and current_time < reminder_time + timedelta(minutes=1):
-                        self.gui_callback(f"Sắp diễn ra: {event_name}\nThời gian: {start_time.strftime('%H:%M %d/%m/%Y')}\nĐịa điểm: {location}")
-                time.sleep(60) # Nhắc nhở mỗi phút
+                self.run_pending()
+                next_due = self.next_due()
+                if next_due is not None:
+                    seconds = (next_due - self.clock()).total_seconds()
+                    timeout = max(0, min(timeout, seconds))
             except Exception as e:
-                time.sleep(60)
+                print(f"Lỗi nhắc nhở: {e}")
+            
+            with self._condition:
+                if self.is_running and not self._wakeup:
+                    self._condition.wait(timeout)
+                self._wakeup = False
+
+class CalendarEventCard:
+    """Thẻ sự kiện trong một cột của bảng lịch, được tạo một lần và cấu hình lại tại chỗ"""
+    
+    NAME_LENGTH = 20
+    
+    def __init__(self, app, parent):
+        self.app = app
+        self.event = None    # EventRow (hoặc lần lặp) đang hiển thị, dùng cho click và tooltip
+        self.state = None    # Những gì đang vẽ trên thẻ; giống nhau thì không đụng tới widget
+        self.visible = False
+        
+        self.frame = tk.Frame(parent, relief=tk.RAISED, borderwidth=1)
+        
+        # Thời gian
+        self.time_label = tk.Label(self.frame,
+                                   font=('Segoe UI', 9, 'bold'),
+                                   width=6)
+        self.time_label.pack(side=tk.LEFT, padx=5, pady=2)
+        
+        # Tên sự kiện
+        self.name_label = tk.Label(self.frame,
+                                   font=('Segoe UI', 9),
+                                   anchor='w')
+        self.name_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
+        
+        # Bind một lần, đọc sự kiện hiện tại của thẻ khi được click/rê chuột
+        for widget in (self.frame, self.time_label, self.name_label):
+            widget.bind("<Button-1>", self.on_click)
+        app.create_tooltip(self.frame, self.details_text)
+    
+    def on_click(self, event=None):
+        if self.event is not None:
+            self.app.highlight_event(self.event.id)
+    
+    def details_text(self):
+        # Dùng dòng đã lấy ở lần vẽ lịch gần nhất, không tra lại DB theo id: lịch được
+        # vẽ lại mỗi khi ChangeDetector báo bảng events đổi nên dòng này không cũ
+        if self.event is None:
+            return ""
+        return self.app.format_event_details(self.event)
+    
+    def show(self, event, color):
+        """Hiển thị event với màu color, chỉ cấu hình lại widget khi nội dung đổi"""
+        self.event = event
+        state = (event.start.strftime("%H:%M"), event.name, color)
+        if state != self.state:
+            start_text, name, color = state
+            self.frame.configure(bg=color)
+            self.time_label.configure(text=start_text, bg=color)
+            self.name_label.configure(
+                text=name[:self.NAME_LENGTH] + ('...' if len(name) > self.NAME_LENGTH else ''),
+                bg=color)
+            self.state = state
+        
+        if not self.visible:
+            self.frame.pack(fill=tk.X, pady=2)
+            self.visible = True
+    
+    def hide(self):
+        self.event = None
+        if self.visible:
+            self.frame.pack_forget()
+            self.visible = False
+
+class CalendarDayColumn:
+    """Một cột ngày của bảng lịch: header và các thẻ sự kiện lấy từ pool của cột"""
+    
+    MAX_CARDS = 5  # Tối đa 5 sự kiện, còn lại gộp thành một dòng "... và N sự kiện khác"
+    
+    def __init__(self, app, parent, column):
+        self.app = app
+        self.header_state = None
+        self.cards = []
+        self.visible_cards = 0
+        self.more_visible = False
+        
+        # Tạo frame cho mỗi ngày
+        self.day_frame = tk.Frame(parent, relief=tk.RAISED, borderwidth=1)
+        self.day_frame.grid(row=0, column=column, sticky=(tk.W, tk.E, tk.N, tk.S), padx=2, pady=2)
+        
+        # Header ngày
+        self.header_frame = tk.Frame(self.day_frame, height=44)
+        self.header_frame.pack(fill=tk.X)
+        self.header_frame.pack_propagate(False)
+        
+        # Ngày và thứ
+        self.day_label = tk.Label(self.header_frame, font=('Segoe UI', 11, 'bold'))
+        self.day_label.pack(side=tk.LEFT, padx=10, pady=5)
+        
+        # Thứ trong tuần
+        self.weekday_label = tk.Label(self.header_frame, font=('Segoe UI', 9), fg='#666')
+        self.weekday_label.pack(side=tk.LEFT, pady=5)
+        
+        # Đánh dấu hôm nay (chỉ pack ở cột hôm nay)
+        self.today_label = tk.Label(self.header_frame,
+                                    text="NOW",
+                                    font=('Segoe UI', 8, 'bold'),
+                                    bg='#dc3545',
+                                    fg='white')
+        
+        # Nội dung sự kiện
+        self.content_frame = tk.Frame(self.day_frame, bg='white')
+        self.content_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.more_label = tk.Label(self.content_frame,
+                                   font=('Segoe UI', 8, 'italic'),
+                                   fg='#666',
+                                   bg='white',
+                                   cursor='hand2')
+        # Click vào dòng "... và N sự kiện khác" highlight các sự kiện bị ẩn của ngày
+        self.hidden_ids = []
+        self.more_label.bind("<Button-1>", lambda e: self.app.highlight_events(self.hidden_ids))
+    
+    def update(self, day, is_today, events):
+        """Cập nhật cột cho ngày day với danh sách events (đã sắp theo thời gian)"""
+        header_state = (day.date(), is_today)
+        if header_state != self.header_state:
+            self.update_header(day, is_today)
+            self.header_state = header_state
+        
+        visible = min(len(events), self.MAX_CARDS)
+        # Thẻ mới được pack vào cuối cột nên phải gỡ dòng "... và N sự kiện khác" trước
+        if visible > self.visible_cards and self.more_visible:
+            self.more_label.pack_forget()
+            self.more_visible = False
+        
+        for index, event in enumerate(events[:visible]):
+            if index == len(self.cards):
+                self.cards.append(CalendarEventCard(self.app, self.content_frame))
+            self.cards[index].show(event, self.app.get_event_color(index))
+        for card in self.cards[visible:]:
+            card.hide()
+        self.visible_cards = visible
+        
+        # Nếu có nhiều hơn MAX_CARDS sự kiện, hiển thị thông báo
+        self.hidden_ids = list(dict.fromkeys(event.id for event in events[visible:]))
+        hidden = len(events) - visible
+        if hidden:
+            more_text = f"... và {hidden} sự kiện khác"
+            if self.more_label.cget('text') != more_text:
+                self.more_label.configure(text=more_text)
+            if not self.more_visible:
+                self.more_label.pack(pady=2)
+                self.more_visible = True
+        elif self.more_visible:
+            self.more_label.pack_forget()
+            self.more_visible = False
+    
+    def update_header(self, day, is_today):
+        day_bg = '#fff3cd' if is_today else '#f8f9fa'
+        header_bg = '#ffc107' if is_today else '#e9ecef'
+        self.day_frame.configure(bg=day_bg)
+        self.header_frame.configure(bg=header_bg)
+        self.day_label.configure(text=day.strftime("%d\n%b"), bg=header_bg)
+        self.weekday_label.configure(text=day.strftime("(%A)"), bg=header_bg)
+        if is_today:
+            self.today_label.pack(side=tk.RIGHT, padx=5, pady=2)
+        else:
+            self.today_label.pack_forget()
 
 class ScheduleApp:
     """Ứng dụng quản lý lịch trình chính với giao diện hiện đại"""
@@ -967,12 +2786,89 @@ class ScheduleApp:
         
         self.nlp_processor = VietnameseNLPProcessor()
         self.db_manager = DatabaseManager()
-        self.reminder_system = ReminderSystem(self.db_manager, self.show_reminder_popup)
+        # Nhắc nhở từ thread nền được xếp hàng rồi do vòng lặp Tk lấy ra (xem drain_reminders)
+        self.reminder_queue = deque(maxlen=self.REMINDER_BACKLOG)
+        self.reminder_queue_lock = threading.Lock()
+        self.reminders_dropped = 0
+        self.reminder_panel = None
+        self.reminder_system = ReminderSystem(self.db_manager, self.enqueue_reminder)
+        
+        # Worker xử lý NLP/ghi DB để không chặn vòng lặp Tk.
+        # _request_id tăng mỗi khi có yêu cầu mới, kết quả của yêu cầu cũ bị bỏ qua
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="schedule-worker")
+        self._request_id = 0
+        self._pending_future = None
+        self._spinner_job = None
+        self._spinner_index = 0
+        
+        self.change_detector = ChangeDetector(self.db_manager)
+        
+        # Trạng thái phân trang của danh sách sự kiện (xem load_events)
+        self.tree_items = {}
+        self._tree_after = None
+        self._tree_has_more = False
+        self._tree_loading = False
+        
+        # Các cột của bảng lịch, tạo ở lần update_calendar đầu tiên rồi dùng lại
+        self.calendar_columns = []
         
         self.setup_gui()
         self.reminder_system.start()
         self.load_events()
         self.update_calendar()
+        
+        self.root.after(self.CHANGE_POLL_MS, self.poll_db_changes)
+        self.root.after(self.REMINDER_DRAIN_MS, self.drain_reminders)
+        
+        # Nạp tokenizer ở nền sau khi cửa sổ đã hiển thị
+        self.root.after(200, self.warm_up_nlp)
+    
+    CHANGE_POLL_MS = 1000
+    
+    def poll_db_changes(self):
+        """Kiểm tra DB định kỳ, chỉ nạp lại khi có bảng thực sự thay đổi"""
+        try:
+            changed = self.change_detector.poll()
+        except sqlite3.Error as e:
+            print(f"Lỗi kiểm tra thay đổi dữ liệu: {e}")
+            changed = set()
+        
+        if 'events' in changed:
+            self.reminder_system.wake()
+            self.reload_events_view()
+        
+        self.root.after(self.CHANGE_POLL_MS, self.poll_db_changes)
+    
+    def reload_events_view(self):
+        """Nạp lại danh sách (giữ bộ lọc tìm kiếm đang dùng) và bảng lịch"""
+        if self.search_entry.get().strip():
+            self.search_events()
+        else:
+            self.load_events()
+        self.update_calendar()
+    
+    def warm_up_nlp(self):
+        """Nạp Underthesea trong thread nền và báo thời gian nạp lên thanh trạng thái"""
+        def load():
+            try:
+                get_word_tokenize()
+            except Exception:
+                pass
+        
+        self.status_var.set("⏳ Đang nạp bộ tách từ tiếng Việt...")
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        self.root.after(100, self._report_nlp_warm_up, thread)
+    
+    def _report_nlp_warm_up(self, thread):
+        if thread.is_alive():
+            self.root.after(100, self._report_nlp_warm_up, thread)
+            return
+        
+        if _word_tokenize_error is not None:
+            self.status_var.set("⚠️ Không nạp được Underthesea, dùng tách từ đơn giản")
+        else:
+            self.status_var.set(f"🟢 Sẵn sàng (nạp Underthesea {tokenizer_load_seconds:.2f}s)")
     
     def setup_styles(self):
         """Cấu hình styles cho giao diện"""
@@ -1074,6 +2970,7 @@ class ScheduleApp:
         text_scrollbar = ttk.Scrollbar(input_container, command=self.input_text.yview)
         text_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.input_text.configure(yscrollcommand=text_scrollbar.set)
+        self.input_text.bind('<<Modified>>', self.on_input_changed)
         
         # Nút Thêm sự kiện
         button_container = ttk.Frame(input_card)
@@ -1178,7 +3075,8 @@ class ScheduleApp:
         v_scrollbar = ttk.Scrollbar(tree_container, orient=tk.VERTICAL, command=self.tree.yview)
         h_scrollbar = ttk.Scrollbar(tree_container, orient=tk.HORIZONTAL, command=self.tree.xview)
         
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree_scrollbar = v_scrollbar
+        self.tree.configure(yscrollcommand=self.on_tree_scroll, xscrollcommand=h_scrollbar.set)
         
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
@@ -1195,6 +3093,7 @@ class ScheduleApp:
         buttons = [
             ("✏️ Sửa", self.edit_event, 'Secondary.TButton'),
             ("🗑️ Xóa", self.delete_event, 'Secondary.TButton'),
+            ("📥 Nhập", self.import_events, 'Secondary.TButton'),
             ("📤 Xuất", self.export_events, 'Secondary.TButton'),
             ("🔄 Làm mới", self.refresh_all, 'Primary.TButton'),
         ]
@@ -1234,133 +3133,34 @@ class ScheduleApp:
         self.calendar_canvas.itemconfig(self.calendar_window, width=event.width)
     
     def update_calendar(self):
-        """Cập nhật bảng lịch với thiết kế đẹp"""
-        # Xóa các widget cũ
-        for widget in self.calendar_inner_frame.winfo_children():
-            widget.destroy()
+        """Cập nhật bảng lịch 7 ngày
         
+        Các cột ngày và thẻ sự kiện được giữ lại giữa các lần cập nhật (xem
+        CalendarDayColumn); mỗi lần chỉ cấu hình lại những thẻ có nội dung đổi,
+        không hủy rồi dựng lại widget nên bảng lịch không bị nháy.
+        """
         # Lấy ngày hiện tại
         today = datetime.now()
+        first_day = today.date()
+        
+        # Tạo 7 cột một lần, các lần sau dùng lại
+        if not self.calendar_columns:
+            for i in range(7):
+                self.calendar_columns.append(CalendarDayColumn(self, self.calendar_inner_frame, i))
+                self.calendar_inner_frame.columnconfigure(i, weight=1)
+        
+        # Chỉ lấy sự kiện trong 7 ngày hiển thị (đã sắp theo thời gian) và nhóm theo ngày trong một lượt;
+        # chuỗi lặp chỉ sinh các lần lặp rơi vào 7 ngày này
+        events = self.db_manager.get_occurrences_between(first_day, first_day + timedelta(days=7))
+        events_by_day = [[] for _ in self.calendar_columns]
+        for event in events:
+            # Sự kiện bắt đầu trước hôm nay (đang diễn ra) không thuộc cột nào
+            day_index = (event.start.date() - first_day).days
+            if 0 <= day_index < len(events_by_day):
+                events_by_day[day_index].append(event)
         
-        # Tạo mảng 7 ngày tới
-        days = []
-        for i in range(7):
-            current_day = today + timedelta(days=i)
-            days.append(current_day)
-        
-        # Tạo header cho calendar
-        for i, day in enumerate(days):
-            is_today = (day.date() == today.date())
-            
-            # Tạo frame cho mỗi ngày
-            day_frame = tk.Frame(self.calendar_inner_frame,
-                                bg='#f8f9fa' if not is_today else '#fff3cd',
-                                relief=tk.RAISED,
-                                borderwidth=1)
-            day_frame.grid(row=0, column=i, sticky=(tk.W, tk.E, tk.N, tk.S), padx=2, pady=2)
-            
-            # Header ngày
-            header_bg = '#e9ecef' if not is_today else '#ffc107'
-            header_frame = tk.Frame(day_frame, bg=header_bg, height=44)
-            header_frame.pack(fill=tk.X)
-            header_frame.pack_propagate(False)
-            
-            # Ngày và thứ
-            day_label = tk.Label(header_frame,
-                                text=day.strftime("%d\n%b"),
-                                font=('Segoe UI', 11, 'bold'),
-                                bg=header_bg)
-            day_label.pack(side=tk.LEFT, padx=10, pady=5)
-            
-            # Thứ trong tuần
-            weekday_label = tk.Label(header_frame,
-                                    text=day.strftime("(%A)"),
-                                    font=('Segoe UI', 9),
-                                    bg=header_bg,
-                                    fg='#666')
-            weekday_label.pack(side=tk.LEFT, pady=5)
-            
-            # Đánh dấu hôm nay
-            if is_today:
-                today_label = tk.Label(header_frame,
-                                      text="NOW",
-                                      font=('Segoe UI', 8, 'bold'),
-                                      bg='#dc3545',
-                                      fg='white')
-                today_label.pack(side=tk.RIGHT, padx=5, pady=2)
-            
-            # Nội dung sự kiện
-            content_frame = tk.Frame(day_frame, bg='white')
-            content_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Lấy tất cả sự kiện
-        events = self.db_manager.get_events()
-        
-        # Nhóm sự kiện theo ngày
-        for i, day in enumerate(days):
-            # Lấy content_frame cho ngày này
-            day_widget = self.calendar_inner_frame.grid_slaves(row=0, column=i)[0]
-            content_frame = day_widget.winfo_children()[1]  # Lấy content_frame
-            
-            # Đếm sự kiện cho ngày này
-            day_events = []
-            for event in events:
-                event_id, event_name, start_time_str, end_time_str, location, reminder_minutes, created_at = event
-                start_time = datetime.fromisoformat(start_time_str)
-                
-                if start_time.date() == day.date():
-                    day_events.append((event_id, event_name, start_time, location))
-            
-            # Sắp xếp sự kiện theo thời gian
-            day_events.sort(key=lambda x: x[2])
-            
-            # Hiển thị các sự kiện
-            for idx, (event_id, event_name, start_time, location) in enumerate(day_events[:5]):  # Tối đa 5 sự kiện
-                event_color = self.get_event_color(idx)
-                
-                event_frame = tk.Frame(content_frame,
-                                      bg=event_color,
-                                      relief=tk.RAISED,
-                                      borderwidth=1)
-                event_frame.pack(fill=tk.X, pady=2)
-                
-                # Thời gian
-                time_label = tk.Label(event_frame,
-                                     text=start_time.strftime("%H:%M"),
-                                     font=('Segoe UI', 9, 'bold'),
-                                     bg=event_color,
-                                     width=6)
-                time_label.pack(side=tk.LEFT, padx=5, pady=2)
-                
-                # Tên sự kiện
-                name_label = tk.Label(event_frame,
-                                     text=event_name[:20] + ('...' if len(event_name) > 20 else ''),
-                                     font=('Segoe UI', 9),
-                                     bg=event_color,
-                                     anchor='w')
-                name_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
-                
-                # Bind click event
-                event_frame.bind("<Button-1>", lambda e, ev_id=event_id: self.highlight_event(ev_id))
-                time_label.bind("<Button-1>", lambda e, ev_id=event_id: self.highlight_event(ev_id))
-                name_label.bind("<Button-1>", lambda e, ev_id=event_id: self.highlight_event(ev_id))
-                
-                # Tooltip
-                tooltip_text = f"{event_name}\n⏰ {start_time.strftime('%H:%M')}\n📍 {location}"
-                self.create_tooltip(event_frame, tooltip_text)
-            
-            # Nếu có nhiều hơn 5 sự kiện, hiển thị thông báo
-            if len(day_events) > 5:
-                more_label = tk.Label(content_frame,
-                                     text=f"... và {len(day_events)-5} sự kiện khác",
-                                     font=('Segoe UI', 8, 'italic'),
-                                     fg='#666',
-                                     bg='white')
-                more_label.pack(pady=2)
-        
-        # Cấu hình grid
-        for i in range(7):
-            self.calendar_inner_frame.columnconfigure(i, weight=1)
+        for i, (column, day_events) in enumerate(zip(self.calendar_columns, events_by_day)):
+            column.update(today + timedelta(days=i), i == 0, day_events)
     
     def get_event_color(self, index):
         """Lấy màu cho sự kiện dựa trên index"""
@@ -1375,9 +3175,24 @@ class ScheduleApp:
         ]
         return colors[index % len(colors)]
     
+    @staticmethod
+    def format_event_details(event):
+        """Nội dung tooltip của một EventRow (hoặc một lần lặp của chuỗi)"""
+        time_text = event.start.strftime('%H:%M')
+        if event.end:
+            time_text += f" - {event.end.strftime('%H:%M')}"
+        
+        lines = [event.name, f"⏰ {time_text}", f"📍 {event.location}"]
+        if event.reminder_minutes:
+            lines.append(f"🔔 trước {event.reminder_minutes} phút")
+        if event.recurrence:
+            lines.append(f"🔁 {event.recurrence.describe()}")
+        return "\n".join(lines)
+    
     def create_tooltip(self, widget, text):
-        """Tạo tooltip đẹp cho widget"""
+        """Tạo tooltip đẹp cho widget (text có thể là hàm, gọi khi tooltip hiện lên)"""
         def show_tooltip(event):
+            tooltip_text = text() if callable(text) else text
             x, y, _, _ = widget.bbox("insert")
             x += widget.winfo_rootx() + 25
             y += widget.winfo_rooty() + 25
@@ -1395,7 +3210,7 @@ class ScheduleApp:
             tooltip_frame.pack()
             
             tooltip_label = tk.Label(tooltip_frame,
-                                    text=text,
+                                    text=tooltip_text,
                                     font=('Segoe UI', 9),
                                     bg='#333',
                                     fg='white',
@@ -1414,19 +3229,42 @@ class ScheduleApp:
     
     def highlight_event(self, event_id):
         """Highlight sự kiện trong danh sách"""
-        for item in self.tree.get_children():
-            if self.tree.item(item, "values")[0] == str(event_id):
-                self.tree.selection_remove(self.tree.selection())
-                self.tree.selection_set(item)
-                self.tree.see(item)
-                self.tree.focus(item)
-                
-                # Tạo tag highlight
-                self.tree.tag_configure("highlight", background='#d4edda')
-                self.tree.item(item, tags=("highlight",))
-                
-                self.root.after(2000, lambda: self.tree.item(item, tags=()))
-                break
+        self.highlight_events([event_id])
+    
+    def highlight_events(self, event_ids):
+        """Highlight các sự kiện trong danh sách, báo trên thanh trạng thái những sự kiện không có dòng"""
+        items = [self.tree_items[event_id] for event_id in event_ids if event_id in self.tree_items]
+        
+        # Danh sách đang lọc (tìm kiếm) hoặc chưa nạp tới trang chứa các dòng này
+        missing = [event_id for event_id in event_ids if event_id not in self.tree_items]
+        if missing:
+            events = self.db_manager.get_events_by_ids(missing)
+            if events:
+                names = ", ".join(f"'{event.name}' ({event.start.strftime('%H:%M %d/%m/%Y')})"
+                                  for event in events[:3])
+                if len(events) > 3:
+                    names += f" và {len(events) - 3} sự kiện khác"
+                self.status_var.set(f"{names} không có trong danh sách hiện tại")
+        
+        if not items:
+            return
+        
+        self.tree.selection_remove(self.tree.selection())
+        self.tree.selection_set(items)
+        self.tree.see(items[0])
+        self.tree.focus(items[0])
+        
+        # Tạo tag highlight
+        self.tree.tag_configure("highlight", background='#d4edda')
+        for item in items:
+            self.tree.item(item, tags=("highlight",))
+        
+        def clear_highlight():
+            for item in items:
+                if self.tree.exists(item):
+                    self.tree.item(item, tags=())
+        
+        self.root.after(2000, clear_highlight)
     
     def refresh_all(self):
         """Làm mới tất cả dữ liệu"""
@@ -1436,39 +3274,7 @@ class ScheduleApp:
     
     def test_nlp(self):
         """Test chức năng NLP với câu mẫu"""
-        test_cases = [
-            # 5 test case gốc (có lời nhắc)
-            "nhắc tôi họp nhóm lúc 10 giờ sáng mai ở phòng 302, nhắc trước 15 phút",
-            "nhac toi hop nhom luc 10 gio 30 sáng mai va ket thuc luc 12h o phong 302, nhac truoc 15 phut",
-            "nhắc tôi họp công ty lúc 10:30 thứ 2 tuần tới tại tầng trệt , nhắc trước 20 p",
-            "nhắc tôi họp công ty lúc 10:30 chủ nhật tuần sau tại tầng trệt , nhắc trước 20 p",
-            "nhắc tôi họp công ty lúc 9:30 cuối tuần tại tầng 5, nhắc trước 20 phút",
-            "Nhắc tôi họp lúc 8h30 sáng mai tại văn phòng, nhắc trước 30 phút",
-            "Nhắc tôi gọi điện cho khách hàng lúc 15 giờ ngày mai.",
-            "Nhac toi hop luc 10:00 thu Ba tuan sau, nhac truoc 1 gio",
-            "Nhắc tôi đi tập thể dục lúc 6 giờ sáng thứ Tư này.",
-            "Nhac toi nop bao cao luc 17h thu Sau, nhac truoc 2 gio", 
-            "Nhắc tôi họp nhóm lúc 14h30 chiều mai.",
-            "Nhắc tôi đón con lúc 11:45 trưa mai, nhắc trước 15 phút",
-            "Gap doi tac luc 9 gio sang thu Hai toi", 
-            "Nhắc tôi họp công ty lúc 13:00 ngày kia, nhắc trước 45 phút",
-            "Di kham benh luc 8 gio 15 phut sang thu Bay", 
-            "Nhắc tôi họp online lúc 20:00 tối nay, nhắc trước 10 phút",
-            "Nhắc tôi học bài lúc 19h30 tối thứ Năm.",
-            "Hop luc 10 gio sang cuoi tuan, nhac truoc 30 phut", 
-            "Nhắc tôi gửi email lúc 16h45 chiều thứ Tư.",
-            "Nhắc tôi họp lúc 9:00 sáng chủ nhật tuần này tại phòng E502, trường Đại học Sài Gòn, nhắc trước 1 giờ",
-            "Di sieu thi luc 10 gio 30 sang thu Bay", 
-            "Nhắc tôi họp lúc 11h trưa mai, nhắc trước 20 phút",
-            "Goi cho sep luc 15:30 chieu thu Sau", 
-            "Nhắc tôi họp tổng kết lúc 14 giờ thứ 4 3 tuần nữa, nhắc trước 1 giờ",
-            "Dam cuoi luc 17:00 thu Bay tuan sau", 
-            "Nhắc tôi họp lúc 8 giờ sáng thứ Hai tuần tới, nhắc trước 25 phút",
-            "Gap ban luc 18h30 toi thu Tu", 
-            "Nhắc tôi họp lúc 7:45 sáng mai, nhắc trước 15 phút",
-            "Nop bai luc 23:59 toi chu nhat", 
-            "Nhắc tôi họp lúc 12:00 trưa thứ Năm, nhắc trước 30 phút" 
-        ]
+        test_cases = NLP_TEST_CASES
         
         print("\n" + "="*60)
         print("KẾT QUẢ TEST NLP")
@@ -1498,6 +3304,9 @@ class ScheduleApp:
         
         print("\n" + "="*60)
     
+    SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+    POLL_INTERVAL_MS = 50
+    
     def add_event_from_text(self):
         text = self.input_text.get("1.0", tk.END).strip()
         
@@ -1505,11 +3314,85 @@ class ScheduleApp:
             messagebox.showwarning("Cảnh báo", "Vui lòng nhập yêu cầu!")
             return
         
-        self.status_var.set("Đang xử lý tiếng Việt...")
-        self.root.update()
+        # Yêu cầu mới thay thế yêu cầu đang xử lý (nếu có)
+        self.cancel_pending_request()
+        future = self.worker.submit(self.nlp_processor.process_text, text)
+        self._track_request(future, self.on_text_parsed, "Đang xử lý tiếng Việt...")
+    
+    def on_input_changed(self, event=None):
+        """Người dùng sửa nội dung thì kết quả của yêu cầu đang phân tích không còn đúng nữa
+        
+        Chỉ nội dung đổi mới tính (<<Modified>>), phím di chuyển/chọn/sao chép thì không.
+        """
+        # <<Modified>> chỉ báo khi cờ modified chuyển sang True; đặt lại cờ để nhận lần sửa sau
+        # (chính lệnh đặt lại cũng sinh <<Modified>>, khi đó cờ đang False nên bỏ qua)
+        if not self.input_text.edit_modified():
+            return
+        self.input_text.edit_modified(False)
+        
+        if self._pending_future is not None:
+            self.cancel_pending_request()
+            self.status_var.set("Đã hủy yêu cầu cũ")
+    
+    def cancel_pending_request(self):
+        """Bỏ yêu cầu đang chờ: hủy nếu chưa chạy, nếu đang chạy thì bỏ qua kết quả"""
+        self._request_id += 1
+        if self._pending_future is not None:
+            self._pending_future.cancel()
+            self._pending_future = None
+        self.stop_spinner()
+    
+    def _track_request(self, future, callback, message, cancellable=True):
+        """Theo dõi future từ worker, gọi callback trên thread Tk khi xong
+        
+        Yêu cầu không hủy được (ghi DB) luôn được báo kết quả dù người dùng gõ tiếp.
+        """
+        request_id = None
+        if cancellable:
+            self._request_id += 1
+            request_id = self._request_id
+            self._pending_future = future
+        self.start_spinner(message)
+        self.root.after(self.POLL_INTERVAL_MS, self._poll_request, request_id, future, callback)
+    
+    def _poll_request(self, request_id, future, callback):
+        if request_id is not None and request_id != self._request_id:
+            return  # Đã bị thay thế hoặc hủy
+        
+        if not future.done():
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_request, request_id, future, callback)
+            return
+        
+        if request_id is not None:
+            self._pending_future = None
+        self.stop_spinner()
         
-        result = self.nlp_processor.process_text(text)
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Lỗi xử lý: {str(e)}")
+            self.status_var.set("Lỗi xử lý")
+            return
         
+        callback(result)
+    
+    def start_spinner(self, message):
+        self.stop_spinner()
+        self._spinner_index = 0
+        self._spin(message)
+    
+    def _spin(self, message):
+        frame = self.SPINNER_FRAMES[self._spinner_index % len(self.SPINNER_FRAMES)]
+        self.status_var.set(f"{frame} {message}")
+        self._spinner_index += 1
+        self._spinner_job = self.root.after(100, self._spin, message)
+    
+    def stop_spinner(self):
+        if self._spinner_job is not None:
+            self.root.after_cancel(self._spinner_job)
+            self._spinner_job = None
+    
+    def on_text_parsed(self, result):
         if "error" in result:
             messagebox.showerror("Lỗi", result["error"])
             self.status_var.set("Lỗi xử lý")
@@ -1518,6 +3401,7 @@ class ScheduleApp:
         # Hiển thị kết quả chi tiết
         start_time = datetime.fromisoformat(result['start_time'])
         end_time = datetime.fromisoformat(result['end_time']) if result['end_time'] else None
+        recurrence = result.get('recurrence')
         
         confirmation_msg = f"""
 Kết quả trích xuất:
@@ -1526,40 +3410,83 @@ Kết quả trích xuất:
 - Thời gian kết thúc: {end_time.strftime('%H:%M %d/%m/%Y') if end_time else 'Không có'}
 - Địa điểm: {result['location']}
 - Nhắc nhở: trước {result['reminder_minutes']} phút
+- Lặp lại: {RecurrenceRule.parse(recurrence).describe() if recurrence else 'Không'}
 
 Bạn có muốn thêm sự kiện này?
         """
         
         if messagebox.askyesno("Xác nhận", confirmation_msg):
-            event_id = self.db_manager.add_event(result)
-            self.status_var.set(f"Đã thêm sự kiện #{event_id}")
-            self.input_text.delete("1.0", tk.END)
-            self.load_events()
+            future = self.worker.submit(self.db_manager.add_event, result)
+            self._track_request(future, self.on_event_added, "Đang lưu sự kiện...", cancellable=False)
         else:
             self.status_var.set("Đã hủy thêm sự kiện")
     
+    def on_event_added(self, event_id):
+        self.reminder_system.wake()
+        self.change_detector.acknowledge()
+        self.status_var.set(f"Đã thêm sự kiện #{event_id}")
+        self.input_text.delete("1.0", tk.END)
+        self.reload_events_view()
+    
     def load_events(self, events=None):
         for item in self.tree.get_children():
             self.tree.delete(item)
+        # id sự kiện -> dòng trong tree, để highlight_event không phải quét danh sách
+        self.tree_items = {}
+        self._tree_after = None
+        self._tree_has_more = False
+        self._tree_loading = False
         
         if events is None:
-            events = self.db_manager.get_events()
+            # Toàn bộ danh sách: nạp theo trang, trang tiếp theo nạp khi cuộn gần cuối
+            self._tree_has_more = True
+            self.load_more_events()
+            return
         
+        self.insert_tree_events(events)
+    
+    def load_more_events(self):
+        """Nạp trang kế tiếp của danh sách sự kiện vào tree"""
+        self._tree_loading = False
+        if not self._tree_has_more:
+            return
+        
+        page = self.db_manager.get_events_page(self._tree_after)
+        self.insert_tree_events(page)
+        
+        if len(page) < self.db_manager.PAGE_SIZE:
+            self._tree_has_more = False
+        else:
+            self._tree_after = page[-1]
+    
+    def on_tree_scroll(self, first, last):
+        self.tree_scrollbar.set(first, last)
+        
+        if self._tree_has_more and not self._tree_loading and float(last) >= 0.9:
+            self._tree_loading = True
+            self.root.after_idle(self.load_more_events)
+    
+    def insert_tree_events(self, events):
         for event in events:
             event_id, event_name, start_time_str, end_time_str, location, reminder_minutes, created_at = event
-            start_time = datetime.fromisoformat(start_time_str)
+            try:
+                start_time_display = event.start.strftime('%H:%M %d/%m/%Y')
+            except ValueError:
+                start_time_display = f"⚠ {start_time_str}"  # Thời gian không đọc được, hiện nguyên văn
             
             # Xử lý thời gian kết thúc
             if end_time_str:
-                end_time = datetime.fromisoformat(end_time_str)
-                end_time_display = end_time.strftime('%H:%M %d/%m/%Y')
+                try:
+                    end_time_display = event.end.strftime('%H:%M %d/%m/%Y')
+                except ValueError:
+                    end_time_display = f"⚠ {end_time_str}"
             else:
                 end_time_display = "Không có"
             
-            self.tree.insert("", tk.END, values=(
+            self.tree_items[event_id] = self.tree.insert("", tk.END, values=(
                 event_id,
-                event_name,
-                start_time.strftime('%H:%M %d/%m/%Y'),
+                f"{event_name} 🔁" if event.rrule else event_name,
+                start_time_display,
                 end_time_display,
                 location,
                 f"{reminder_minutes} phút" if reminder_minutes > 0 else "Không"
@@ -1586,31 +3513,29 @@ Bạn có muốn thêm sự kiện này?
         item = selected_item[0]
         event_id = self.tree.item(item, "values")[0]
         
-        events = self.db_manager.get_events()
-        current_event = None
-        
-        for event in events:
-            if str(event[0]) == event_id:
-                current_event = {
-                    "event": event[1],
-                    "start_time": event[2],
-                    "end_time": event[3],
-                    "location": event[4],
-                    "reminder_minutes": event[5]
-                }
-                break
+        event = self.db_manager.get_event(int(event_id))
         
-        if not current_event:
+        if event is None:
             messagebox.showerror("Lỗi", "Không tìm thấy sự kiện!")
             return
         
+        current_event = {
+            "event": event[1],
+            "start_time": event[2],
+            "end_time": event[3],
+            "location": event[4],
+            "reminder_minutes": event[5]
+        }
+        
         edit_dialog = EditEventDialog(self.root, current_event)
         self.root.wait_window(edit_dialog.dialog)
         
         if edit_dialog.result:
             self.db_manager.update_event(event_id, edit_dialog.result)
+            self.reminder_system.wake()
+            self.change_detector.acknowledge()
             self.status_var.set(f"Đã cập nhật sự kiện #{event_id}")
-            self.load_events()
+            self.reload_events_view()
     
     def delete_event(self):
         selected_item = self.tree.selection()
@@ -1625,14 +3550,65 @@ Bạn có muốn thêm sự kiện này?
         
         if messagebox.askyesno("Xác nhận", f"Bạn có chắc muốn xóa sự kiện '{event_name}'?"):
             self.db_manager.delete_event(event_id)
+            self.reminder_system.wake()
+            self.change_detector.acknowledge()
             self.status_var.set(f"Đã xóa sự kiện #{event_id}")
-            self.load_events()
+            self.reload_events_view()
+    
+    def import_events(self):
+        """Khôi phục sự kiện từ file JSON (bản xuất của ứng dụng) hoặc iCalendar"""
+        filename = filedialog.askopenfilename(
+            parent=self.root,
+            title="Chọn file để nhập",
+            filetypes=[("Lịch (JSON, iCalendar)", "*.json *.ics"),
+                       ("JSON", "*.json"),
+                       ("iCalendar", "*.ics")])
+        
+        if not filename:
+            return  # Người dùng hủy
+        
+        if filename.lower().endswith('.ics'):
+            events = ICSImporter.read_ics_file(filename)
+        else:
+            events = self.read_json_events(filename)
+        
+        # Đọc file và ghi DB trên worker; nhập hàng loạt trong một transaction
+        future = self.worker.submit(self.db_manager.add_events_many, events)
+        self._track_request(future, self.on_events_imported, "Đang nhập sự kiện...", cancellable=False)
+    
+    @staticmethod
+    def read_json_events(filename):
+        """Đọc file JSON do export_events tạo ra, sinh các dict sự kiện"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if not isinstance(data, list):
+            raise ValueError("File JSON không đúng định dạng xuất của ứng dụng")
+        
+        for item in data:
+            yield {
+                "event": item["event"],
+                "start_time": item["start_time"],
+                "end_time": item.get("end_time"),
+                "location": item.get("location") or "",
+                "reminder_minutes": item.get("reminder_minutes") or 0,
+                "recurrence": item.get("recurrence"),
+                "exdates": item.get("exdates"),
+                "created_at": item.get("created_at"),
+            }
+    
+    def on_events_imported(self, event_ids):
+        self.reminder_system.wake()
+        self.change_detector.acknowledge()
+        self.reload_events_view()
+        self.status_var.set(f"✅ Đã nhập {len(event_ids)} sự kiện")
+        messagebox.showinfo("Thành công", f"Đã nhập {len(event_ids)} sự kiện")
     
     def export_events(self):
         """Xuất sự kiện ra file (JSON hoặc iCalendar)"""
-        events = self.db_manager.get_events()
+        total = self.db_manager.count_events()
         
-        if not events:
+        if not total:
             messagebox.showwarning("Cảnh báo", "Không có sự kiện nào để xuất!")
             return
         
@@ -1645,38 +3621,25 @@ Bạn có muốn thêm sự kiện này?
         
         export_format = export_dialog.format
         
+        # Sự kiện được đọc dần từ DB và ghi dần ra file, không nạp cả bảng vào bộ nhớ
         try:
             if export_format == "json":
-                export_data = []
-                for event in events:
-                    event_id, event_name, start_time_str, end_time_str, location, reminder_minutes, created_at = event
-                    
-                    export_data.append({
-                        "event": event_name,
-                        "start_time": start_time_str,
-                        "end_time": end_time_str,
-                        "location": location,
-                        "reminder_minutes": reminder_minutes,
-                        "created_at": created_at
-                    })
-                
                 filename = f"schedule_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, ensure_ascii=False, indent=2)
+                count = self.save_json_file(self.db_manager.stream_events(), filename)
                 
-                self.status_var.set(f"✅ Đã xuất {len(export_data)} sự kiện ra {filename}")
+                self.status_var.set(f"✅ Đã xuất {count} sự kiện ra {filename}")
                 messagebox.showinfo("Thành công", 
-                                f"Đã xuất {len(export_data)} sự kiện ra file JSON:\n{filename}")
+                                f"Đã xuất {count} sự kiện ra file JSON:\n{filename}")
             
             elif export_format == "ics":
                 filename = f"schedule_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ics"
-                ICSExporter.save_ics_file(events, filename)
+                count = ICSExporter.save_ics_file(self.db_manager.stream_events(), filename)
                 
-                self.status_var.set(f"✅ Đã xuất {len(events)} sự kiện ra {filename}")
+                self.status_var.set(f"✅ Đã xuất {count} sự kiện ra {filename}")
                 
                 # Hiển thị hướng dẫn sử dụng file .ics
                 instructions = f"""
-    ✅ Đã xuất {len(events)} sự kiện ra file iCalendar:
+    ✅ Đã xuất {count} sự kiện ra file iCalendar:
     {filename}
 
     📱 Cách sử dụng file .ics:
@@ -1695,37 +3658,159 @@ Bạn có muốn thêm sự kiện này?
                 
                 # Xuất JSON
                 json_filename = f"schedule_export_{timestamp}.json"
-                export_data = []
-                for event in events:
-                    event_id, event_name, start_time_str, end_time_str, location, reminder_minutes, created_at = event
-                    export_data.append({
-                        "event": event_name,
-                        "start_time": start_time_str,
-                        "end_time": end_time_str,
-                        "location": location,
-                        "reminder_minutes": reminder_minutes,
-                        "created_at": created_at
-                    })
-                
-                with open(json_filename, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, ensure_ascii=False, indent=2)
+                count = self.save_json_file(self.db_manager.stream_events(), json_filename)
                 
                 # Xuất ICS
                 ics_filename = f"schedule_export_{timestamp}.ics"
-                ICSExporter.save_ics_file(events, ics_filename)
+                ics_count = ICSExporter.save_ics_file(self.db_manager.stream_events(), ics_filename)
                 
-                self.status_var.set(f"✅ Đã xuất {len(events)} sự kiện ra 2 file")
+                self.status_var.set(f"✅ Đã xuất {count} sự kiện ra 2 file")
                 messagebox.showinfo("Thành công",
-                                f"Đã xuất {len(events)} sự kiện ra 2 file:\n"
-                                f"• {json_filename} (JSON)\n"
-                                f"• {ics_filename} (iCalendar)")
+                                f"Đã xuất sự kiện ra 2 file:\n"
+                                f"• {json_filename} (JSON, {count} sự kiện)\n"
+                                f"• {ics_filename} (iCalendar, {ics_count} sự kiện)")
         
         except Exception as e:
             messagebox.showerror("Lỗi", f"Lỗi khi xuất file: {str(e)}")
             self.status_var.set("❌ Lỗi xuất dữ liệu")
     
-    def show_reminder_popup(self, message):
-        messagebox.showinfo("NHẮC NHỞ SỰ KIỆN", message)
+    @staticmethod
+    def save_json_file(events, filename):
+        """Ghi dần sự kiện ra file JSON (cùng định dạng json.dump(..., indent=2)), trả về số sự kiện"""
+        count = 0
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("[")
+            for event in events:
+                event_id, event_name, start_time_str, end_time_str, location, reminder_minutes, created_at = event
+                data = {
+                    "event": event_name,
+                    "start_time": start_time_str,
+                    "end_time": end_time_str,
+                    "location": location,
+                    "reminder_minutes": reminder_minutes,
+                    "created_at": created_at
+                }
+                # Chuỗi lặp: start_time là lần đầu, các lần lặp sinh lại từ quy tắc khi nhập
+                if getattr(event, 'rrule', None):
+                    data["recurrence"] = event.rrule
+                    data["exdates"] = event.exdates
+                item = json.dumps(data, ensure_ascii=False, indent=2)
+                f.write(",\n" if count else "\n")
+                f.write(textwrap.indent(item, "  "))
+                count += 1
+            f.write("\n]" if count else "]")
+        return count
+    
+    REMINDER_BACKLOG = 200       # Số nhắc nhở tối đa chờ hiển thị, quá thì bỏ cái cũ nhất
+    REMINDER_DRAIN_MS = 250
+    REMINDER_PANEL_LIMIT = 100   # Số nhắc nhở giữ lại trên bảng nhắc nhở
+    
+    def enqueue_reminder(self, message):
+        """Nhận nhắc nhở từ thread bất kỳ; không gọi Tk ở đây"""
+        with self.reminder_queue_lock:
+            if len(self.reminder_queue) == self.reminder_queue.maxlen:
+                self.reminders_dropped += 1
+            self.reminder_queue.append((datetime.now(), message))
+    
+    def drain_reminders(self):
+        """Lấy hết nhắc nhở đang chờ và hiển thị chúng trong một lần cập nhật"""
+        with self.reminder_queue_lock:
+            reminders = list(self.reminder_queue)
+            self.reminder_queue.clear()
+            dropped, self.reminders_dropped = self.reminders_dropped, 0
+        
+        if reminders:
+            self.show_reminder_panel(reminders, dropped)
+        
+        self.root.after(self.REMINDER_DRAIN_MS, self.drain_reminders)
+    
+    def show_reminder_panel(self, reminders, dropped=0):
+        """Bảng nhắc nhở không chặn: nhắc mới được thêm lên đầu, cửa sổ dùng lại nếu đang mở"""
+        if self.reminder_panel is None or not self.reminder_panel.winfo_exists():
+            self.create_reminder_panel()
+        
+        text = self.reminder_text
+        text.configure(state=tk.NORMAL)
+        for received_at, message in reversed(reminders):
+            text.insert("1.0", f"⏰ {received_at.strftime('%H:%M:%S')}\n{message}\n\n")
+            # Mark đầu mỗi nhắc nhở (gravity phải: nhắc mới chèn ở 1.0 đẩy mark xuống theo)
+            # vì tên/địa điểm có thể nhiều dòng, không tính được vị trí theo số dòng
+            self._reminder_mark_seq += 1
+            mark = f"reminder{self._reminder_mark_seq}"
+            text.mark_set(mark, "1.0")
+            self.reminder_marks.appendleft(mark)
+        
+        # Giữ bảng gọn: xóa từ đầu nhắc nhở thứ REMINDER_PANEL_LIMIT + 1 trở đi
+        if len(self.reminder_marks) > self.REMINDER_PANEL_LIMIT:
+            text.delete(self.reminder_marks[self.REMINDER_PANEL_LIMIT], tk.END)
+            while len(self.reminder_marks) > self.REMINDER_PANEL_LIMIT:
+                text.mark_unset(self.reminder_marks.pop())
+        text.configure(state=tk.DISABLED)
+        
+        self.reminder_count += len(reminders)
+        self.reminder_dropped_total += dropped
+        summary = f"🔔 {self.reminder_count} nhắc nhở"
+        if self.reminder_dropped_total:
+            summary += f" (bỏ qua {self.reminder_dropped_total} nhắc cũ do quá nhiều)"
+        self.reminder_summary.set(summary)
+        
+        self.reminder_panel.deiconify()
+        self.reminder_panel.lift()
+        self.root.bell()
+        self.status_var.set(f"🔔 {len(reminders)} nhắc nhở mới")
+    
+    def create_reminder_panel(self):
+        panel = tk.Toplevel(self.root)
+        panel.title("NHẮC NHỞ SỰ KIỆN")
+        panel.geometry("380x320")
+        panel.configure(bg=self.colors['light'])
+        panel.transient(self.root)
+        panel.protocol("WM_DELETE_WINDOW", panel.withdraw)
+        
+        self.reminder_summary = tk.StringVar()
+        tk.Label(panel,
+                 textvariable=self.reminder_summary,
+                 font=('Segoe UI', 11, 'bold'),
+                 bg=self.colors['primary'],
+                 fg='white',
+                 anchor='w',
+                 padx=10,
+                 pady=6).pack(fill=tk.X)
+        
+        text_frame = tk.Frame(panel, bg=self.colors['light'])
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+        
+        self.reminder_text = tk.Text(text_frame,
+                                     font=('Segoe UI', 10),
+                                     wrap=tk.WORD,
+                                     bg='white',
+                                     relief=tk.SOLID,
+                                     borderwidth=1,
+                                     state=tk.DISABLED)
+        self.reminder_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(text_frame, command=self.reminder_text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.reminder_text.configure(yscrollcommand=scrollbar.set)
+        
+        ttk.Button(panel, text="Đã xem", command=self.dismiss_reminders).pack(pady=(0, 8))
+        
+        self.reminder_panel = panel
+        self.reminder_count = 0
+        self.reminder_dropped_total = 0
+        self.reminder_marks = deque()   # Mark đầu của từng nhắc nhở, mới nhất trước
+        self._reminder_mark_seq = 0
+    
+    def dismiss_reminders(self):
+        """Xóa các nhắc nhở đã xem và ẩn bảng"""
+        self.reminder_text.configure(state=tk.NORMAL)
+        self.reminder_text.delete("1.0", tk.END)
+        for mark in self.reminder_marks:
+            self.reminder_text.mark_unset(mark)
+        self.reminder_marks.clear()
+        self.reminder_text.configure(state=tk.DISABLED)
+        self.reminder_count = 0
+        self.reminder_dropped_total = 0
+        self.reminder_panel.withdraw()
 
 class EditEventDialog:
     def __init__(self, parent, current_event):
@@ -1885,7 +3970,13 @@ def main():
     app = ScheduleApp(root)
     
     def on_closing():
+        # Chờ worker và thread nhắc nhở dừng hẳn rồi mới đóng kết nối DB: close()
+        # đóng cả kết nối của các thread đó, đang dùng dở sẽ lỗi hoặc mất nhắc nhở
+        app.cancel_pending_request()
+        app.worker.shutdown(wait=True)
+        app.nlp_processor.close()
         app.reminder_system.stop()
+        app.db_manager.close()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
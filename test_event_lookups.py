@@ -0,0 +1,59 @@
+"""Kiểm tra tra cứu sự kiện theo khóa chính (get_event, get_events_by_ids)
+
+Chạy: python -m pytest -q test_event_lookups.py
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from main import DatabaseManager
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(os.path.join(tmp_path, "lookups.db"))
+    start = datetime(2025, 1, 1, 8, 0)
+    manager.add_events_many(
+        {"event": f"Sự kiện {i}",
+         "start_time": (start + timedelta(hours=i)).isoformat(),
+         "end_time": None,
+         "location": "", "reminder_minutes": 0}
+        for i in range(20)
+    )
+    yield manager
+    manager.close()
+
+
+def test_get_events_by_ids_keeps_requested_order(db_manager):
+    events = db_manager.get_events_by_ids([7, 3, 12, 3, 999, '5'])
+
+    # Id lặp lại chỉ trả một lần, id không tồn tại bị bỏ qua, id dạng chuỗi (từ tree) được nhận
+    assert [event.id for event in events] == [7, 3, 12, 5]
+    assert [event.name for event in events] == ["Sự kiện 6", "Sự kiện 2", "Sự kiện 11", "Sự kiện 4"]
+
+
+def test_get_events_by_ids_in_chunks(db_manager, monkeypatch):
+    monkeypatch.setattr(DatabaseManager, 'IDS_CHUNK_SIZE', 3)
+    event_ids = list(range(20, 0, -1))
+
+    assert [event.id for event in db_manager.get_events_by_ids(event_ids)] == event_ids
+
+
+def test_get_events_by_ids_empty(db_manager):
+    assert db_manager.get_events_by_ids([]) == []
+
+
+def test_get_events_by_ids_uses_primary_key(db_manager):
+    sql = db_manager.SELECT_EVENTS_BY_IDS_SQL.format('?, ?, ?')
+    rows = db_manager.connection().execute(f'EXPLAIN QUERY PLAN {sql}', (1, 2, 3)).fetchall()
+    details = [row[-1] for row in rows]
+
+    assert any('INTEGER PRIMARY KEY' in detail for detail in details), details
+    assert not any(detail.startswith('SCAN events') for detail in details), details
+
+
+def test_get_event(db_manager):
+    assert db_manager.get_event(4).name == "Sự kiện 3"
+    assert db_manager.get_event(999) is None
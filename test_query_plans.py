@@ -0,0 +1,69 @@
+"""Kiểm tra các truy vấn theo khoảng thời gian dùng index epoch, không quét toàn bảng
+
+Chạy: python -m pytest -q test_query_plans.py
+"""
+
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from main import DatabaseManager
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(os.path.join(tmp_path, "plans.db"))
+    start = datetime(2025, 1, 1, 8, 0)
+    manager.add_events_many(
+        {"event": f"Sự kiện {i}",
+         "start_time": (start + timedelta(hours=i)).isoformat(),
+         "end_time": (start + timedelta(hours=i, minutes=30)).isoformat() if i % 2 else None,
+         "location": "", "reminder_minutes": 0}
+        for i in range(200)
+    )
+    manager.connection().execute('ANALYZE')
+    yield manager
+    manager.close()
+
+
+def query_plan(db_manager, sql, params):
+    rows = db_manager.connection().execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_scans(details):
+    return [detail for detail in details if detail.startswith('SCAN events')]
+
+
+def test_events_between_uses_start_index(db_manager):
+    params = {"start": db_manager.to_epoch(date(2025, 1, 3)),
+              "end": db_manager.to_epoch(date(2025, 1, 10))}
+    details = query_plan(db_manager, db_manager.SELECT_EVENTS_BETWEEN_SQL, params)
+
+    assert any('USING INDEX idx_events_start_ts' in detail for detail in details), details
+    assert any('USING INDEX idx_events_end_ts' in detail for detail in details), details
+    assert not full_scans(details), details
+
+
+def test_day_range_uses_start_index(db_manager):
+    details = query_plan(db_manager, db_manager.SELECT_EVENTS_ON_DATE_SQL,
+                         db_manager.day_range('2025-01-05'))
+
+    assert any('USING INDEX idx_events_start_ts' in detail for detail in details), details
+    assert not full_scans(details), details
+
+
+def test_events_from_uses_indexes(db_manager):
+    params = {"start": db_manager.to_epoch(date(2025, 1, 3))}
+    details = query_plan(db_manager, db_manager.SELECT_EVENTS_FROM_SQL, params)
+
+    assert any('USING INDEX idx_events_start_ts' in detail for detail in details), details
+    # Nhánh chuỗi lặp duyệt index một phần idx_events_series (chỉ chứa dòng có rrule)
+    assert all('USING INDEX idx_events_series' in detail for detail in full_scans(details)), details
+
+
+def test_events_between_results(db_manager):
+    events = db_manager.get_events_between(date(2025, 1, 2), date(2025, 1, 3))
+
+    assert [event.start for event in events] == [datetime(2025, 1, 2, h) for h in range(24)]